@@ -0,0 +1,84 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Rows handled per strip; bounds the size of the temporary HSV buffer
+DEFAULT_STRIP_ROWS = 512
+
+PreprocessResult = namedtuple('PreprocessResult', ['image', 'black_mask', 'color_mask'])
+
+
+def _saturating_add(channel, amount):
+    """ In-place saturating uint8 add on a (possibly strided) channel view. """
+    if amount > 0:
+        np.minimum(channel, 255 - amount, out=channel)
+        channel += amount
+    elif amount < 0:
+        np.maximum(channel, -amount, out=channel)
+        channel -= -amount
+
+
+def preprocess_wire_colors(image, strip_rows=DEFAULT_STRIP_ROWS, black_value_max=50,
+                           saturation_boost=50, value_boost=30, output_order='rgb',
+                           out=None, in_place=False):
+    """ Fused remove_black_edges + enhance_colors + BGR->RGB in a single HSV pass.
+
+    The image is processed in row strips so only one strip-sized HSV buffer is
+    alive at a time. The result, black mask and color mask live in preallocated
+    full-size arrays which are returned as-is (no copies).
+    """
+    if output_order not in ('rgb', 'bgr'):
+        raise ValueError(f"Unknown output order: {output_order}")
+    back_code = cv2.COLOR_HSV2RGB if output_order == 'rgb' else cv2.COLOR_HSV2BGR
+
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    if in_place:
+        out = image
+    elif out is None:
+        out = np.empty_like(image)
+
+    black_mask = np.empty((height, width), dtype=np.uint8)
+    color_mask = np.empty((height, width), dtype=np.uint8)
+    strip_rows = max(1, min(strip_rows, height))
+    hsv_buffer = np.empty((strip_rows, width, 3), dtype=np.uint8)
+
+    for top in range(0, height, strip_rows):
+        bottom = min(top + strip_rows, height)
+        hsv = hsv_buffer[:bottom - top]
+        cv2.cvtColor(image[top:bottom], cv2.COLOR_BGR2HSV, dst=hsv)
+
+        # Black is anything with a low value, regardless of hue and saturation
+        black = hsv[:, :, 2] <= black_value_max
+        np.multiply(black, 255, out=black_mask[top:bottom], casting='unsafe')
+        np.subtract(255, black_mask[top:bottom], out=color_mask[top:bottom])
+
+        # Blacked-out pixels go through the enhancement as HSV (0, 0, 0),
+        # matching remove_black_edges followed by enhance_colors
+        hsv[black] = 0
+        _saturating_add(hsv[:, :, 1], saturation_boost)
+        _saturating_add(hsv[:, :, 2], value_boost)
+
+        cv2.cvtColor(hsv, back_code, dst=out[top:bottom])
+
+    return PreprocessResult(out, black_mask, color_mask)
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    image = cv2.imread(sys.argv[1]) if len(sys.argv) > 1 else \
+        np.random.default_rng(0).integers(0, 256, (4000, 6000, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    result = preprocess_wire_colors(image)
+    print(f"Preprocessed {image.shape[1]}x{image.shape[0]} in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{np.count_nonzero(result.color_mask)} colored pixels")
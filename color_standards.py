@@ -0,0 +1,139 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy
+
+import re
+
+import numpy as np
+
+# Corporate wire palette, as given in the Checkpoint 3 validation prompt
+CORPORATE_COLOR_CODE_MAP = {
+    '0': {'name': 'Black', 'hex': '#231F20'},
+    '1': {'name': 'Brown', 'hex': '#CF8B2D'},
+    '2': {'name': 'Red', 'hex': '#ED1846'},
+    '3': {'name': 'Orange', 'hex': '#F58220'},
+    '4': {'name': 'Yellow', 'hex': '#FFF200'},
+    '5': {'name': 'Green', 'hex': '#008C44'},
+    '6': {'name': 'Blue', 'hex': '#00C0F3'},
+    '7': {'name': 'Purple', 'hex': '#524FA1'},
+    '8': {'name': 'Grey', 'hex': '#BCBEC0'},
+    '9': {'name': 'White', 'hex': '#FFFFFF'}
+}
+
+DEFAULT_STANDARD = 'corporate'
+
+# CIE76 distance below which two colors count as the same wire color
+DEFAULT_DELTA_E_TOLERANCE = 20.0
+
+_HEX_PATTERN = re.compile(r'^#?([0-9a-fA-F]{6})$')
+
+# D65 reference white and the sRGB -> XYZ matrix
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+_SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+
+def hex_to_rgb(hex_code):
+    """ Converts '#RRGGBB' to an (r, g, b) tuple. """
+    hex_code = hex_code.lstrip('#')
+    return tuple(int(hex_code[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def rgb_to_lab(rgb):
+    """ Converts an (..., 3) array of 0-255 sRGB values to CIE Lab (D65, L in 0-100). """
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _SRGB_TO_XYZ.T / _WHITE
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def delta_e(lab_a, lab_b):
+    """ CIE76 color difference, broadcast over (..., 3) Lab arrays. """
+    return np.linalg.norm(np.asarray(lab_a) - np.asarray(lab_b), axis=-1)
+
+
+class ColorStandard:
+    """ A named digit -> color table with precomputed RGB and Lab values.
+
+    Keys must be single digits '0'-'9'; a standard may leave digits out.
+    digit_rows maps a digit value to its row in names/hexes/rgb/lab (-1 if absent).
+    """
+
+    def __init__(self, name, color_code_map):
+        invalid = [digit for digit in color_code_map if not (len(digit) == 1 and digit in '0123456789')]
+        if invalid:
+            raise ValueError(f"Color standard {name} has keys that are not single digits: {invalid}")
+        self.name = name
+        self.digits = sorted(color_code_map)
+        self.digit_rows = np.full(10, -1, dtype=np.int8)
+        self.digit_rows[[int(digit) for digit in self.digits]] = np.arange(len(self.digits))
+        self.names = [color_code_map[d]['name'] for d in self.digits]
+        self.hexes = [color_code_map[d]['hex'] for d in self.digits]
+        self.rgb = np.array([hex_to_rgb(h) for h in self.hexes], dtype=np.float64)
+        self.lab = rgb_to_lab(self.rgb)
+        self._name_index = {name.lower(): i for i, name in enumerate(self.names)}
+
+    def _parse(self, value):
+        """ RGB for one color given as a standard name, a hex string or an RGB triple. """
+        if isinstance(value, str):
+            index = self._name_index.get(value.strip().lower())
+            if index is not None:
+                return self.rgb[index]
+            match = _HEX_PATTERN.match(value.strip())
+            if match:
+                return np.array(hex_to_rgb(match.group(1)), dtype=np.float64)
+            return np.full(3, np.nan)
+        # Blank cells (None, NaN) and other scalars such as numeric cells are unknown colors
+        if value is None or np.ndim(value) == 0 or np.size(value) != 3:
+            return np.full(3, np.nan)
+        return np.asarray(value, dtype=np.float64).reshape(3)
+
+    def to_rgb(self, colors):
+        """ (N, 3) RGB array for names, hex strings or RGB triples; NaN rows if unknown. """
+        if isinstance(colors, np.ndarray) and colors.dtype.kind in 'iuf':
+            return colors.reshape(-1, 3).astype(np.float64)
+        colors = list(colors)
+        if not colors:
+            return np.empty((0, 3))
+        if all(isinstance(value, str) for value in colors):
+            # Parse each distinct string once
+            unique, inverse = np.unique(np.array(colors, dtype=str), return_inverse=True)
+            return np.array([self._parse(value) for value in unique])[inverse.ravel()]
+        return np.array([self._parse(value) for value in colors])
+
+    def to_lab(self, colors):
+        return rgb_to_lab(self.to_rgb(colors))
+
+
+_REGISTRY = {}
+
+
+def register_color_standard(name, color_code_map, replace=False):
+    """ Adds a digit -> {'name', 'hex'} table to the registry and returns its ColorStandard. """
+    if name in _REGISTRY and not replace:
+        raise ValueError(f"Color standard already registered: {name}")
+    _REGISTRY[name] = ColorStandard(name, color_code_map)
+    return _REGISTRY[name]
+
+
+def get_color_standard(name=DEFAULT_STANDARD):
+    """ Returns a registered ColorStandard (or passes a ColorStandard through). """
+    if isinstance(name, ColorStandard):
+        return name
+    if name not in _REGISTRY:
+        raise KeyError(f"Unknown color standard: {name} (known: {sorted(_REGISTRY)})")
+    return _REGISTRY[name]
+
+
+def list_color_standards():
+    return sorted(_REGISTRY)
+
+
+register_color_standard('corporate', CORPORATE_COLOR_CODE_MAP)
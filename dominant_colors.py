@@ -0,0 +1,205 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python scikit-learn
+
+import time
+
+import cv2
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+# Default number of pixels fed to the sampling based strategies
+DEFAULT_SAMPLE_SIZE = 50000
+
+
+def _as_pixels(image):
+    """ Returns an (N, 3) uint8 view of an RGB image or pixel array. """
+    pixels = np.asarray(image)
+    if pixels.dtype != np.uint8:
+        pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+    return pixels.reshape(-1, 3)
+
+
+def stratified_sample(image, sample_size=DEFAULT_SAMPLE_SIZE, random_state=0):
+    """ Samples pixels on a jittered grid so every region of the image is represented. """
+    image = np.asarray(image)
+    if image.ndim == 2:
+        pixels = image.reshape(-1, 3)
+        if len(pixels) <= sample_size:
+            return pixels
+        rng = np.random.default_rng(random_state)
+        return pixels[rng.choice(len(pixels), sample_size, replace=False)]
+
+    height, width = image.shape[:2]
+    if height * width <= sample_size:
+        return image.reshape(-1, 3)
+    if min(height, width) < np.sqrt(height * width / sample_size):
+        # Too thin for a grid, fall back to plain random sampling
+        return stratified_sample(image.reshape(-1, 3), sample_size, random_state)
+
+    # One sample per step x step cell, at a random offset inside the cell
+    step = int(np.ceil(np.sqrt(height * width / sample_size)))
+    rng = np.random.default_rng(random_state)
+    rows = np.arange(0, height - step + 1, step)
+    cols = np.arange(0, width - step + 1, step)
+    rows = rows[:, None] + rng.integers(0, step, size=(len(rows), len(cols)))
+    cols = cols[None, :] + rng.integers(0, step, size=(len(rows), len(cols)))
+    return image[rows, cols].reshape(-1, 3)
+
+
+def _color_bins(pixels, bits):
+    """ Histogram bin index of every pixel of an (N, 3) uint8 array. """
+    quantized = (pixels >> (8 - bits)).astype(np.int32)
+    return (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+
+
+def histogram_dominant_colors(image, k=5, bits=5, sample_size=DEFAULT_SAMPLE_SIZE, random_state=0):
+    """ Finds dominant colors from a quantized color histogram (bits per channel).
+
+    Bin counts, and so the shares, come from every pixel (cv2.calcHist). The
+    mean color of each winning bin is taken from a stratified sample: all
+    pixels of a bin lie in the same small color box, so a sample is enough.
+    """
+    pixels = _as_pixels(image)
+    n_side = 1 << bits
+    counts = cv2.calcHist([np.ascontiguousarray(pixels).reshape(-1, 1, 3)], [0, 1, 2], None,
+                          [n_side] * 3, [0, 256] * 3).astype(np.int64).ravel()
+    top = np.argsort(counts)[::-1][:k]
+    top = top[counts[top] > 0]
+
+    sample = _as_pixels(stratified_sample(image, sample_size, random_state))
+    sample_bins = _color_bins(sample, bits)
+    centers = np.empty((len(top), 3), dtype=np.float64)
+    for i, index in enumerate(top):
+        members = sample[sample_bins == index]
+        if len(members):
+            centers[i] = members.mean(axis=0)
+        else:
+            # Bin too small to be sampled: average its pixels directly
+            centers[i] = pixels[_color_bins(pixels, bits) == index].mean(axis=0)
+
+    shares = counts[top] / len(pixels)
+    return np.rint(centers).astype(int), shares
+
+
+def minibatch_dominant_colors(image, k=5, sample_size=DEFAULT_SAMPLE_SIZE, random_state=0):
+    """ Finds dominant colors with MiniBatchKMeans on a stratified pixel sample. """
+    sample = stratified_sample(image, sample_size, random_state).astype(np.float32)
+    k = min(k, len(np.unique(sample, axis=0)))
+    kmeans = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3,
+                             batch_size=4096)
+    labels = kmeans.fit_predict(sample)
+
+    counts = np.bincount(labels, minlength=k)
+    order = np.argsort(counts)[::-1]
+    centers = kmeans.cluster_centers_[order]
+    shares = counts[order] / len(sample)
+    return np.rint(centers).astype(int), shares
+
+
+def median_cut_dominant_colors(image, k=5, sample_size=DEFAULT_SAMPLE_SIZE, random_state=0):
+    """ Finds dominant colors by recursively splitting the widest color box at its median. """
+    pixels = stratified_sample(image, sample_size, random_state)
+    boxes = [pixels]
+
+    while len(boxes) < k:
+        # Split the box with the largest channel range
+        ranges = [np.ptp(box, axis=0).max() if len(box) > 1 else -1 for box in boxes]
+        index = int(np.argmax(ranges))
+        if ranges[index] <= 0:
+            break
+        box = boxes.pop(index)
+        channel = int(np.argmax(np.ptp(box, axis=0)))
+        box = box[np.argsort(box[:, channel], kind="stable")]
+        # Cut at a value boundary so identical colors never end up in both halves
+        values = box[:, channel]
+        median = values[len(box) // 2]
+        cut = np.searchsorted(values, median, side='left')
+        if cut == 0:
+            cut = np.searchsorted(values, median, side='right')
+        boxes.extend([box[:cut], box[cut:]])
+
+    boxes.sort(key=len, reverse=True)
+    centers = np.array([box.mean(axis=0) for box in boxes])
+    shares = np.array([len(box) for box in boxes]) / len(pixels)
+    return np.rint(centers).astype(int), shares
+
+
+def kmeans_dominant_colors(image, k=5, random_state=0):
+    """ Reference strategy: full-image KMeans, as the original pipeline did. """
+    pixels = _as_pixels(image)
+    kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+    labels = kmeans.fit_predict(pixels)
+
+    counts = np.bincount(labels, minlength=k)
+    order = np.argsort(counts)[::-1]
+    return np.rint(kmeans.cluster_centers_[order]).astype(int), counts[order] / len(pixels)
+
+
+DOMINANT_COLOR_METHODS = {
+    'histogram': histogram_dominant_colors,
+    'minibatch': minibatch_dominant_colors,
+    'median_cut': median_cut_dominant_colors,
+    'kmeans': kmeans_dominant_colors,
+}
+
+
+def compute_dominant_colors(image, k=5, method='histogram', **kwargs):
+    """ Returns (centers, shares) for an RGB image using the selected strategy. """
+    if method not in DOMINANT_COLOR_METHODS:
+        raise ValueError(f"Unknown dominant color method: {method}")
+    return DOMINANT_COLOR_METHODS[method](image, k=k, **kwargs)
+
+
+def quantization_error(image, centers, sample_size=DEFAULT_SAMPLE_SIZE):
+    """ Mean RGB distance from (sampled) pixels to their nearest center. """
+    sample = stratified_sample(image, sample_size).astype(np.float32)
+    centers = np.asarray(centers, dtype=np.float32)
+    distances = np.linalg.norm(sample[:, None, :] - centers[None, :, :], axis=2)
+    return float(distances.min(axis=1).mean())
+
+
+def benchmark_dominant_colors(image, k=5, sizes=(512, 1024, 2048),
+                              methods=('histogram', 'minibatch', 'median_cut'), repeat=1):
+    """ Times each strategy on resized copies of an RGB image and reports quality. """
+    results = []
+    height, width = image.shape[:2]
+
+    for size in sizes:
+        scale = size / max(height, width)
+        resized = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                             interpolation=cv2.INTER_NEAREST)
+        for method in methods:
+            elapsed = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                centers, shares = compute_dominant_colors(resized, k=k, method=method)
+                elapsed.append(time.perf_counter() - start)
+            results.append({
+                'size': size,
+                'pixels': resized.shape[0] * resized.shape[1],
+                'method': method,
+                'seconds': min(elapsed),
+                'error': quantization_error(resized, centers),
+                'centers': centers.tolist(),
+                'shares': shares.round(4).tolist(),
+            })
+
+    return results
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        image = cv2.cvtColor(cv2.imread(sys.argv[1]), cv2.COLOR_BGR2RGB)
+    else:
+        # Synthetic schematic: white page with a few colored wires
+        image = np.full((2000, 3000, 3), 255, dtype=np.uint8)
+        for i, color in enumerate([(237, 24, 70), (0, 140, 68), (0, 192, 243), (35, 31, 32)]):
+            image[200 + i * 400:230 + i * 400, :] = color
+
+    for row in benchmark_dominant_colors(image, sizes=(512, 1024, 2048, 4096)):
+        print(f"{row['size']:>5}px {row['method']:<10} {row['seconds'] * 1000:8.1f} ms  "
+              f"error {row['error']:6.2f}  centers {row['centers']}")
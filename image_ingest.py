@@ -0,0 +1,126 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pillow
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'bmp')
+THUMBNAIL_SIZE = 256
+DEFAULT_CACHE_DIR = '.image_cache'
+
+
+def scan_images(root, recursive=True):
+    """ [(label, path, mtime_ns, size)] for every image under root, from a single os.scandir walk.
+
+    label is the top-level sub-folder an image sits in (the part number for
+    the graphics library), or '' for images directly in root.
+    """
+    found = []
+    stack = [(root, '')]
+    while stack:
+        folder, label = stack.pop()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive:
+                        stack.append((entry.path, label or entry.name))
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    stat = entry.stat()
+                    found.append((label, entry.path, stat.st_mtime_ns, stat.st_size))
+    found.sort(key=lambda item: (item[0], item[1]))
+    return found
+
+
+def decode_thumbnail(path, size=THUMBNAIL_SIZE):
+    """ Decodes an image straight to at most size x size pixels, as a BGR uint8 array.
+
+    JPEGs are decoded at a reduced DCT scale (draft), other formats are
+    shrunk by an integer factor with reduce() before the final resize, so
+    full-resolution photos are never expanded in memory.
+    """
+    with Image.open(path) as image:
+        if image.format == 'JPEG':
+            image.draft('RGB', (size, size))
+        image = ImageOps.exif_transpose(image)
+        # reduce() doesn't support palette or 1-bit images (common for line-art renders)
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        factor = max(image.size) // (2 * size)
+        if factor > 1:
+            image = image.reduce(factor)
+        image = image.convert('RGB')
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        return np.ascontiguousarray(np.asarray(image)[..., ::-1])
+
+
+def _cache_path(cache_dir, path, size):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npy')
+
+
+def load_thumbnail(path, size=THUMBNAIL_SIZE, cache_dir=DEFAULT_CACHE_DIR):
+    """ Thumbnail from the disk cache, decoding and caching it on a miss; None if unreadable. """
+    if not cache_dir:
+        return decode_thumbnail(path, size)
+    try:
+        cache_path = _cache_path(cache_dir, path, size)
+    except OSError as e:
+        print(f"Could not read {path}: {e}")
+        return None
+    if os.path.exists(cache_path):
+        return np.load(cache_path)
+    try:
+        thumbnail = decode_thumbnail(path, size)
+    except (OSError, ValueError) as e:
+        print(f"Could not decode {path}: {e}")
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        np.save(file, thumbnail)
+    os.replace(temporary, cache_path)
+    return thumbnail
+
+
+def _ingest_one(path, function, size, cache_dir):
+    thumbnail = load_thumbnail(path, size, cache_dir)
+    if thumbnail is None or function is None:
+        return thumbnail
+    return function(thumbnail)
+
+
+def ingest_images(paths, function=None, workers=None, size=THUMBNAIL_SIZE, cache_dir=DEFAULT_CACHE_DIR):
+    """ [function(thumbnail)] (or the thumbnails) for every path, decoded in a process pool.
+
+    Passing a function such as embed_image keeps the per-image work in the
+    workers and sends back only its small result; None marks unreadable images.
+    """
+    paths = list(paths)
+    work = partial(_ingest_one, function=function, size=size, cache_dir=cache_dir)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return [work(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(work, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    start = time.perf_counter()
+    images = scan_images(sys.argv[1])
+    print(f"Scanned {len(images)} images in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for attempt in ("first", "cached"):
+        start = time.perf_counter()
+        shapes = ingest_images([path for _, path, _, _ in images], function=np.shape)
+        print(f"{attempt} pass: {len(shapes)} thumbnails in {(time.perf_counter() - start) * 1000:.0f} ms")
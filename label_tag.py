@@ -1,6 +1,8 @@
 import os
+import re
 import json
 import base64
+import threading
 from PIL import Image
 import io
 from langchain_core.messages import HumanMessage
@@ -12,28 +14,43 @@ import cv2
 import numpy as np
 from sklearn.cluster import KMeans
 import webcolors
+from image_ingest import ingest_images, load_thumbnail, scan_images
+from part_embeddings import embed_image, get_part_index
 
-# Load configuration from JSON and environment
-with open('secret/url.json', 'r') as file:
-    url_data = json.load(file)
-AI_GATEWAY_BASE_URL = url_data.get("ai_gateway")
-issuer_url = url_data.get("issuer_url")
+_model = None
+_model_lock = threading.Lock()
 
-# Load the .env file from the specified directory
-load_dotenv('secret/.env')  # Specify the full path to the .env file
+def get_model():
+    # Credentials are loaded and the token fetched on the first model call, not
+    # at import: the decoding worker processes that import this module, and
+    # runs with rerank=False, never touch them
+    global _model
+    with _model_lock:
+        if _model is not None:
+            return _model
 
-# Retrieve and decrypt the environment variables
-loaded_fernet_key = os.getenv('FERNET_KEY').encode()
-loaded_encrypted_client_id = os.getenv('ENCRYPTED_CLIENT_ID').encode()
-loaded_encrypted_client_secret = os.getenv('ENCRYPTED_CLIENT_SECRET').encode()
+        # Load configuration from JSON and environment
+        with open('secret/url.json', 'r') as file:
+            url_data = json.load(file)
+        AI_GATEWAY_BASE_URL = url_data.get("ai_gateway")
+        issuer_url = url_data.get("issuer_url")
 
-client_id = decrypt_data(loaded_encrypted_client_id, loaded_fernet_key)
-client_secret = decrypt_data(loaded_encrypted_client_secret, loaded_fernet_key)
+        # Load the .env file from the specified directory
+        load_dotenv('secret/.env')  # Specify the full path to the .env file
 
-access_token = get_access_token(client_id, client_secret, issuer_url)
+        # Retrieve and decrypt the environment variables
+        loaded_fernet_key = os.getenv('FERNET_KEY').encode()
+        loaded_encrypted_client_id = os.getenv('ENCRYPTED_CLIENT_ID').encode()
+        loaded_encrypted_client_secret = os.getenv('ENCRYPTED_CLIENT_SECRET').encode()
 
-model = AIGatewayLangchainChatOpenAI(
-    access_token=access_token, base_url=AI_GATEWAY_BASE_URL, model="o1-2024-12-17", deere_ai_gateway_registration_id="graphics-quality-check")
+        client_id = decrypt_data(loaded_encrypted_client_id, loaded_fernet_key)
+        client_secret = decrypt_data(loaded_encrypted_client_secret, loaded_fernet_key)
+
+        access_token = get_access_token(client_id, client_secret, issuer_url)
+
+        _model = AIGatewayLangchainChatOpenAI(
+            access_token=access_token, base_url=AI_GATEWAY_BASE_URL, model="o1-2024-12-17", deere_ai_gateway_registration_id="graphics-quality-check")
+        return _model
 
 def invoke_model(image_base64, prompt):
     message = HumanMessage(
@@ -45,9 +62,26 @@ def invoke_model(image_base64, prompt):
             },
         ],
     )
-    response = model.invoke([message])
+    response = get_model().invoke([message])
     return response.content
 
+def invoke_model_with_images(images_base64, prompt):
+    # One message holding the prompt and several images, each preceded by its caption
+    content = [{"type": "text", "text": prompt}]
+    for caption, image_base64 in images_base64:
+        content.append({"type": "text", "text": caption})
+        content.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}})
+    response = get_model().invoke([HumanMessage(content=content)])
+    return response.content
+
+def encode_jpeg_base64(image, max_side=512):
+    # Downscale before upload: the model only needs the part's shape, not full resolution
+    scale = max_side / max(image.shape[:2])
+    if scale < 1:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return base64.b64encode(buffer.tobytes()).decode("utf-8")
+
 def convert_image(image_path):
     image = Image.open(image_path)
     if image.format not in ["PNG", "JPEG", "GIF", "WEBP", "BMP"]:
@@ -65,31 +99,80 @@ def process_image_with_prompt(image_path, prompt):
     result = invoke_model(image_base64, prompt)
     return result
 
-def identify_part_number(graphics_folder, actual_images_folder):
-    # Loop through each graphics image for training
-    for part_number in os.listdir(graphics_folder):
-        part_folder_path = os.path.join(graphics_folder, part_number)
-        if os.path.isdir(part_folder_path):
-            graphics_images = [os.path.join(part_folder_path, img) for img in os.listdir(part_folder_path) if img.lower().endswith(('png', 'jpg', 'jpeg', 'bmp'))]
-            # Here we could enhance the training process if needed by passing multiple images.
-
-            for actual_image in os.listdir(actual_images_folder):
-                actual_image_path = os.path.join(actual_images_folder, actual_image)
-                if actual_image.lower().endswith(('png', 'jpg', 'jpeg', 'bmp')):  # Check for BMP files
-                    prompt = f"""
-                    Analyze the provided image of a machine part and identify its corresponding part number from the available graphics for {part_number}. 
-                    If there are no exact matches, please provide the closest possible match along with a confidence level or similarity score. 
-                    Include any relevant details that may help in understanding the match, such as distinguishing features or characteristics.
-                    """
-                    result = process_image_with_prompt(actual_image_path, prompt)
-                    print(f"Result for {actual_image}: {result}")
+def rerank_with_model(image, matches):
+    # Second stage: one model call compares the photo with the closest render of
+    # each locally retrieved candidate and picks the final part number.
+    # Candidates whose render can't be read are left out; with no photo or no
+    # readable render the local ranking stands
+    local_choice = {"part_number": matches[0][0], "confidence": matches[0][1], "reason": "local retrieval only"}
+    renders = [load_thumbnail(render_path) for _, _, render_path in matches] if image is not None else []
+    matches = [match for match, render in zip(matches, renders) if render is not None]
+    renders = [render for render in renders if render is not None]
+    if not matches:
+        return local_choice
+
+    candidates = "; ".join(f"{i}. {part_number}" for i, (part_number, _, _) in enumerate(matches, 1))
+    prompt = f"""
+    The first image is a photo of a machine part; it may be rusty, dirty or damaged.
+    The following images are rendered graphics of candidate parts: {candidates}
+    Compare the shape, holes, edges and proportions of the photographed part with each candidate and pick the matching part number.
+    Answer only with JSON: {{"part_number": "<one of the candidates>", "confidence": <0 to 1>, "reason": "<distinguishing features>"}}
+    """
+    images = [("Photo of the actual part:", encode_jpeg_base64(image))]
+    for i, ((part_number, _, _), render) in enumerate(zip(matches, renders), 1):
+        images.append((f"Candidate {i}: {part_number}", encode_jpeg_base64(render)))
+    answer = invoke_model_with_images(images, prompt)
+
+    # Fall back to the local ranking when the answer isn't usable
+    found = re.search(r"\{.*\}", answer, re.DOTALL)
+    try:
+        choice = json.loads(found.group(0)) if found else {}
+    except json.JSONDecodeError:
+        choice = {}
+    if choice.get("part_number") not in [part_number for part_number, _, _ in matches]:
+        return local_choice
+    return choice
+
+def identify_part_number(graphics_folder, actual_images_folder, index_dir="part_index", top_k=3, rerank=True):
+    # Embed every graphics render once (kept on disk in index_dir); each actual
+    # photo is then matched by nearest-neighbour search instead of one model
+    # call per (part, photo) pair. With rerank, a single model call per photo
+    # picks between the top_k candidates
+    index = get_part_index(graphics_folder, index_dir)
+
+    # Scan the photos once and decode them in a process pool straight to cached
+    # thumbnails, so every photo is decoded at most once
+    photos = [path for _, path, _, _ in scan_images(actual_images_folder, recursive=False)]
+    embeddings = ingest_images(photos, embed_image)
+    results = {}
+    for actual_image_path, vector in zip(photos, embeddings):
+        actual_image = os.path.basename(actual_image_path)
+        if vector is None:
+            print(f"Could not read {actual_image}")
+            continue
+        matches = index.identify_vector(vector, top_k=top_k)
+        if not matches:
+            print(f"No graphics indexed for {actual_image}")
+            continue
+        ranked = ", ".join(f"{part_number} ({score:.2f})" for part_number, score, _ in matches)
+        if rerank:
+            result = rerank_with_model(load_thumbnail(actual_image_path), matches)
+            results[actual_image] = result
+            print(f"Result for {actual_image}: {result.get('part_number')} "
+                  f"(confidence {result.get('confidence')}; candidates {ranked})")
+        else:
+            results[actual_image] = matches
+            print(f"Result for {actual_image}: {ranked}")
+    return results
 
 # Set your folders paths here
 graphics_folder = r"C:\Users\W4FGXUV\Downloads\Graphics_Quality_Check\Graphics_Quality_Check\dataset\dataset"
 actual_images_folder = r"C:\Users\W4FGXUV\Downloads\Graphics_Quality_Check\Graphics_Quality_Check\Actual Part Images\Actual Part Images"
 
-# Call the function to identify part numbers
-identify_part_number(graphics_folder, actual_images_folder)
+# Call the function to identify part numbers (guarded so the decoding worker
+# processes don't run it again when they import this module)
+if __name__ == "__main__":
+    identify_part_number(graphics_folder, actual_images_folder)
 
 
 """So i will give you example code which is developed for some other problem statement, and my problem statement, i want you to use the code
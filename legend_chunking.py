@@ -0,0 +1,127 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install pandas
+# pip install tiktoken   (optional, exact token counts)
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# Tokens per chunk of rows, leaving room for the prompt and the answer
+DEFAULT_TOKEN_BUDGET = 30000
+DEFAULT_MAX_CONCURRENCY = 4
+
+_FENCE_PATTERN = re.compile(r'```[\w-]*\s*(.*?)```', re.DOTALL)
+
+
+def estimate_tokens(text):
+    """ Token count with tiktoken when available, else the ~4 characters per token rule. """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def chunk_rows(data_frame, token_budget=DEFAULT_TOKEN_BUDGET, group_column='Requirement'):
+    """ Splits rows into DataFrames whose JSON records fit the token budget.
+
+    Rows of one requirement stay in the same chunk whenever the whole group
+    fits, so a requirement is normally answered by a single call.
+    """
+    records = json.loads(data_frame.to_json(orient='records'))
+    costs = [estimate_tokens(json.dumps(record)) + 1 for record in records]
+
+    if group_column in data_frame.columns:
+        groups = data_frame.groupby(group_column, sort=False).indices.values()
+    else:
+        groups = [[i] for i in range(len(records))]
+
+    chunks, current, used = [], [], 0
+    for group in groups:
+        group = list(group)
+        group_cost = sum(costs[i] for i in group)
+        if current and used + group_cost > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        if group_cost <= token_budget:
+            current.extend(group)
+            used += group_cost
+            continue
+        # A single requirement larger than the budget is split row by row
+        for i in group:
+            if current and used + costs[i] > token_budget:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += costs[i]
+    if current:
+        chunks.append(current)
+
+    return [data_frame.iloc[rows] for rows in chunks]
+
+
+def fan_out(chunks, prompt, invoke, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """ Calls invoke(chunk, prompt) for every chunk, at most max_concurrency at a time. """
+    if len(chunks) <= 1 or max_concurrency <= 1:
+        return [invoke(chunk, prompt) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return list(pool.map(lambda chunk: invoke(chunk, prompt), chunks))
+
+
+def merge_structured_fragments(fragments):
+    """ Merges JSON answers shaped {requirement: [entries]} into one de-duplicated mapping.
+
+    Answers that are not such a JSON object are reported and left out, so
+    their requirements are missing from the result rather than empty.
+    """
+    merged = {}
+    for fragment in fragments:
+        fenced = _FENCE_PATTERN.search(fragment)
+        try:
+            data = json.loads(fenced.group(1) if fenced else fragment)
+        except json.JSONDecodeError as e:
+            print(f"Ignoring an answer that is not valid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            print(f"Ignoring an answer that is not a JSON object: {type(data).__name__}")
+            continue
+        for requirement, entries in data.items():
+            bucket = merged.setdefault(requirement, [])
+            for entry in entries if isinstance(entries, list) else [entries]:
+                if entry not in bucket:
+                    bucket.append(entry)
+    return merged
+
+
+def map_in_chunks(data_frame, prompt, invoke, token_budget=DEFAULT_TOKEN_BUDGET,
+                  max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """ Token-bounded fan-out of invoke(chunk, prompt); [(chunk, answer)] in chunk order.
+
+    Answers stay paired with their rows, so each chunk can be settled with its
+    own answer (and kept as is when that answer is unusable).
+    """
+    chunks = chunk_rows(data_frame, token_budget)
+    return list(zip(chunks, fan_out(chunks, prompt, invoke, max_concurrency)))
+
+
+# Example usage
+if __name__ == "__main__":
+    rows = pd.DataFrame({
+        'Requirement': ['A046'] * 3 + ['B028-1'] * 2,
+        'Anchor Text': ['A046—Drive Train Domain Control Unit'] * 3 + ['B028-1—Battery Cut-Off Relay'] * 2,
+    })
+
+    def fake_invoke(chunk, prompt):
+        return json.dumps({requirement: [f"id-{i}" for i in chunk.index[chunk['Requirement'] == requirement]]
+                           for requirement in chunk['Requirement'].unique()})
+
+    print([len(chunk) for chunk in chunk_rows(rows, token_budget=40)])
+    answers = map_in_chunks(rows, "Keep the matching rows", fake_invoke, token_budget=40)
+    print(merge_structured_fragments(answer for _, answer in answers))
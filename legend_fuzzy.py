@@ -0,0 +1,156 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from legend_index import ANCHOR_TEXT_COLUMN, WORD_PATTERN
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_TOP_K = 10
+DEFAULT_INDEX_DIR = '.workbook_cache'
+
+
+def trigrams(text):
+    """ Set of word trigrams, each word padded like pg_trgm ('  cab ' -> '  c', ' ca', 'cab', 'ab '). """
+    if not isinstance(text, str):
+        return set()
+    grams = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = '  ' + word + ' '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """ Trigram postings over anchor texts for fuzzy top-k requirement lookups.
+
+    Postings are stored CSR-style (indptr into one int32 row array), so a
+    lookup is a concatenation of a few slices and one bincount over the rows.
+    """
+
+    def __init__(self, vocabulary, indptr, rows, row_sizes):
+        self.vocabulary = {gram: i for i, gram in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.rows = rows
+        self.row_sizes = row_sizes
+
+    @classmethod
+    def build(cls, texts):
+        postings = {}
+        row_sizes = np.zeros(len(texts), dtype=np.int32)
+        for row, text in enumerate(texts):
+            grams = trigrams(text)
+            row_sizes[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+
+        vocabulary = sorted(postings)
+        lengths = np.array([len(postings[gram]) for gram in vocabulary], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        rows = np.fromiter((row for gram in vocabulary for row in postings[gram]),
+                           dtype=np.int32, count=int(indptr[-1]))
+        return cls(vocabulary, indptr, rows, row_sizes)
+
+    @classmethod
+    def from_frame(cls, data_frame, column=ANCHOR_TEXT_COLUMN):
+        return cls.build(data_frame[column].tolist())
+
+    def save(self, path):
+        # Written to a temporary file and moved into place, so a crash or another
+        # sheet saving the same index never leaves a truncated file at path
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as file:
+            np.savez(file, vocabulary=np.array(vocabulary, dtype=str), indptr=self.indptr,
+                     rows=self.rows, row_sizes=self.row_sizes)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['vocabulary'].tolist(), data['indptr'], data['rows'], data['row_sizes'])
+
+    def lookup(self, requirement, top_k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD, metric='word'):
+        """ (rows, scores) of the best matching anchor texts, best first.
+
+        metric='word' scores the share of the requirement's trigrams found in
+        the row, so a short requirement matches inside a long anchor text;
+        metric='jaccard' compares the two trigram sets as a whole.
+        """
+        grams = trigrams(requirement)
+        ids = [self.vocabulary[gram] for gram in grams if gram in self.vocabulary]
+        query_size = len(grams)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        hits = np.concatenate([self.rows[self.indptr[i]:self.indptr[i + 1]] for i in ids])
+        overlap = np.bincount(hits, minlength=len(self.row_sizes))
+        if metric == 'jaccard':
+            scores = overlap / np.maximum(query_size + self.row_sizes - overlap, 1)
+        else:
+            scores = overlap / query_size
+
+        candidates = np.flatnonzero(scores >= threshold)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order].astype(np.int64), scores[candidates[order]]
+
+    def lookup_all(self, requirements, top_k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD, metric='word'):
+        """ {requirement: row positions} for every requirement. """
+        return {requirement: self.lookup(requirement, top_k, threshold, metric)[0]
+                for requirement in requirements}
+
+
+def column_key(data_frame, column=ANCHOR_TEXT_COLUMN):
+    """ Short hash of a column's contents, used to name indexes persisted for a sheet. """
+    hashes = pd.util.hash_pandas_object(data_frame[column], index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+
+def get_trigram_index(data_frame, column=ANCHOR_TEXT_COLUMN, index_dir=DEFAULT_INDEX_DIR):
+    """ Loads the sheet's trigram index from disk, building and saving it on first use.
+
+    Indexes are keyed by a hash of the column contents, so an edited sheet
+    gets a new index and an unchanged one is never rebuilt.
+    """
+    if not index_dir:
+        return TrigramIndex.from_frame(data_frame, column)
+    path = os.path.join(index_dir, f'trigrams_{column_key(data_frame, column)}.npz')
+    if os.path.exists(path):
+        return TrigramIndex.load(path)
+
+    index = TrigramIndex.from_frame(data_frame, column)
+    os.makedirs(index_dir, exist_ok=True)
+    index.save(path)
+    return index
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    texts = [
+        "0A046—Drive Train Domain Control Unit (5-V Output) Circuit Test",
+        "X870-8—Power Supply for Drive Train and Transmission Control Unit (A046, A062, A065)",
+        "B028-1—Battery Cut-Off Relay",
+        "Ground Points (Roof)",
+        "Hydraulic & Options Domain CAN-Bus",
+    ] * 20000
+
+    start = time.perf_counter()
+    index = TrigramIndex.build(texts)
+    print(f"Indexed {len(texts)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    requirements = ["Hydraulic and Options Domain CAN Bus", "Ground Point (Roof)", "Battery Cutoff Relay"]
+    start = time.perf_counter()
+    for requirement in requirements:
+        rows, scores = index.lookup(requirement, top_k=3)
+        print(requirement, "->", [(texts[row], round(float(score), 2)) for row, score in zip(rows, scores)])
+    print(f"Looked up {len(requirements)} requirements in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,158 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas
+
+import bisect
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+ANCHOR_TEXT_COLUMN = "Anchor Text"
+MATCH_COLUMN = "Match"
+
+# Component codes such as A046, B028-1, X870-8, GND201 (also found inside 0A046)
+CODE_PATTERN = re.compile(r'[A-Z]{1,4}\d{2,}(?:-\d+)?')
+CODE_ONLY_PATTERN = re.compile(r'^[A-Za-z]{1,4}\d{2,}(?:-\d+)?$')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+# A trailing '*' makes a requirement a prefix query (A04*, Ground Po*)
+PREFIX_WILDCARD = '*'
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def tokenize_anchor_text(text):
+    """ Returns (codes, words) found in one anchor text cell. """
+    if not isinstance(text, str):
+        return [], []
+    codes = CODE_PATTERN.findall(text)
+    return codes, WORD_PATTERN.findall(text.lower())
+
+
+def is_index_query(requirement):
+    """ True for requirements answered by LegendIndex: bare codes and prefix queries. """
+    requirement = requirement.strip()
+    return requirement.endswith(PREFIX_WILDCARD) or bool(CODE_ONLY_PATTERN.match(requirement))
+
+
+class LegendIndex:
+    """ Inverted index from component codes and words to rows of the anchor sheet.
+
+    Codes are kept upper-case and words lower-case in two separate posting
+    tables; each posting list is a sorted int64 array of row positions.
+    """
+
+    def __init__(self, texts):
+        code_postings = defaultdict(list)
+        word_postings = defaultdict(list)
+        for row, text in enumerate(texts):
+            codes, words = tokenize_anchor_text(text)
+            for code in set(codes):
+                code_postings[code].append(row)
+            for word in set(words):
+                word_postings[word].append(row)
+
+        self.size = len(texts)
+        self.codes = {token: np.array(rows, dtype=np.int64) for token, rows in code_postings.items()}
+        self.words = {token: np.array(rows, dtype=np.int64) for token, rows in word_postings.items()}
+        # Sorted vocabularies for prefix lookups
+        self._sorted_codes = sorted(self.codes)
+        self._sorted_words = sorted(self.words)
+
+    @classmethod
+    def from_frame(cls, data_frame, column=ANCHOR_TEXT_COLUMN):
+        return cls(data_frame[column].tolist())
+
+    @staticmethod
+    def _prefix_rows(postings, vocabulary, prefix):
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + '\uffff')
+        if start == end:
+            return _EMPTY
+        return np.unique(np.concatenate([postings[token] for token in vocabulary[start:end]]))
+
+    def lookup(self, requirement, prefix=False):
+        """ Row positions matching a requirement.
+
+        A code requirement (A046, B028-1) matches rows mentioning that code; a
+        descriptive one ("Ground Point (Cab)") matches rows containing all of
+        its words. With prefix=True, or a trailing '*' (A04*), the code, or
+        the last word, is a prefix.
+        """
+        requirement = requirement.strip()
+        if requirement.endswith(PREFIX_WILDCARD):
+            requirement, prefix = requirement[:-1].strip(), True
+        if CODE_ONLY_PATTERN.match(requirement):
+            code = requirement.upper()
+            if prefix:
+                return self._prefix_rows(self.codes, self._sorted_codes, code)
+            return self.codes.get(code, _EMPTY)
+
+        words = WORD_PATTERN.findall(requirement.lower())
+        if not words:
+            return _EMPTY
+        postings = [self.words.get(word, _EMPTY) for word in words[:-1]]
+        if prefix:
+            postings.append(self._prefix_rows(self.words, self._sorted_words, words[-1]))
+        else:
+            postings.append(self.words.get(words[-1], _EMPTY))
+
+        # Intersect the shortest lists first
+        postings.sort(key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def lookup_all(self, requirements, prefix=False):
+        """ {requirement: row positions} for every requirement. """
+        return {requirement: self.lookup(requirement, prefix) for requirement in requirements}
+
+
+def matched_rows_frame(data_frame, matches, kinds=None):
+    """ The matched sheet rows, grouped by requirement, with a leading 'Requirement' column.
+
+    kinds, {requirement: 'exact' | 'fuzzy candidate' | ...}, adds a 'Match'
+    column after it telling exact hits from approximate candidates.
+    """
+    frames = []
+    for requirement, rows in matches.items():
+        if len(rows):
+            frame = data_frame.iloc[rows].copy()
+            frame.insert(0, 'Requirement', requirement)
+            if kinds is not None:
+                frame.insert(1, MATCH_COLUMN, kinds.get(requirement, 'exact'))
+            frames.append(frame)
+    if not frames:
+        empty = data_frame.iloc[0:0].assign(Requirement=[])
+        return empty.assign(**{MATCH_COLUMN: []}) if kinds is not None else empty
+    return pd.concat(frames, ignore_index=True)
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    texts = [
+        "0A046—Drive Train Domain Control Unit (5-V Output) Circuit Test",
+        "A046—Drive Train Domain Control Unit (12-V Supply) Circuit Test",
+        "X870-8—Power Supply for Drive Train and Transmission Control Unit (A046, A062, A065)",
+        "B028-1—Battery Cut-Off Relay",
+        "Ground Point (Cab)",
+    ] * 20000
+
+    start = time.perf_counter()
+    index = LegendIndex(texts)
+    print(f"Indexed {len(texts)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    requirements = ["A046", "B028-1", "B028", "Battery Cut-Off Relay", "Ground Point (Cab)", "Alternator"]
+    start = time.perf_counter()
+    matches = index.lookup_all(requirements)
+    matches["B028*"] = index.lookup("B028*")
+    elapsed = (time.perf_counter() - start) * 1e6
+    for requirement, rows in matches.items():
+        print(f"{requirement}: {len(rows)} rows")
+    print(f"Looked up {len(matches)} requirements in {elapsed:.0f} us")
@@ -0,0 +1,181 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from legend_render import REQUIREMENT_COLUMN
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS legend_mapping (
+    workbook_key TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    requirement TEXT NOT NULL,
+    rows_hash INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    rows_json TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (workbook_key, sheet, requirement)
+);
+"""
+
+
+def requirement_hashes(matched, requirements, requirement_column=REQUIREMENT_COLUMN, fingerprint=''):
+    """ 64-bit hash of the matched rows of every requirement (0 when it has none), as signed ints.
+
+    fingerprint (e.g. a hash of the prompt and mode) is folded into every
+    hash, so rows computed another way never count as up to date.
+    """
+    salt = fingerprint.encode('utf-8')
+    row_hashes = pd.util.hash_pandas_object(matched, index=False).to_numpy()
+    groups = matched.groupby(requirement_column, sort=False).indices
+    hashes = {}
+    for requirement in requirements:
+        rows = groups.get(requirement)
+        if rows is None:
+            hashes[requirement] = 0
+            continue
+        digest = hashlib.sha1(salt + row_hashes[np.sort(rows)].tobytes()).digest()
+        hashes[requirement] = int(np.frombuffer(digest[:8], dtype=np.int64)[0])
+    return hashes
+
+
+class LegendMappingStore:
+    """ SQLite store of legend mapping results keyed by (workbook, sheet, requirement).
+
+    sync() hashes the locally matched rows of each requirement and only sends
+    new requirements, or those whose matching rows changed, to the expensive
+    step (the model); the rows it kept are stored and reused on later runs.
+    """
+
+    def __init__(self, path='legend_mapping.sqlite'):
+        # Sheets are mapped from several threads, so one connection is shared behind a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _stored_hashes(self, workbook_key, sheet):
+        with self._lock:
+            return dict(self.connection.execute(
+                "SELECT requirement, rows_hash FROM legend_mapping WHERE workbook_key = ? AND sheet = ?",
+                (workbook_key, sheet)).fetchall())
+
+    def sync(self, workbook_key, sheet, matched, requirements, compute=None, fingerprint='',
+             requirement_column=REQUIREMENT_COLUMN):
+        """ Stored mapping rows for the requirements, recomputing only the stale ones.
+
+        compute(frame) receives the matched rows of the stale requirements and
+        returns the rows to keep (None keeps them all), or (rows, failed) where
+        failed lists requirements it could not settle: their rows are returned
+        but not stored, so the next run computes them again. fingerprint
+        identifies how rows are computed (see requirement_hashes). Returns
+        (rows, counts).
+        """
+        requirements = list(dict.fromkeys(requirements))
+        hashes = requirement_hashes(matched, requirements, requirement_column, fingerprint)
+        stored = self._stored_hashes(workbook_key, sheet)
+        stale = [requirement for requirement in requirements if stored.get(requirement) != hashes[requirement]]
+
+        pending = {}
+        if stale:
+            fresh = matched[matched[requirement_column].isin(stale)]
+            failed = set()
+            if compute is not None and not fresh.empty:
+                fresh = compute(fresh)
+                if isinstance(fresh, tuple):
+                    fresh, failed = fresh[0], set(fresh[1])
+            groups = fresh.groupby(requirement_column, sort=False).indices
+            now = time.time()
+            rows = []
+            for requirement in stale:
+                positions = groups.get(requirement, [])
+                records = fresh.iloc[positions].to_json(orient='records', force_ascii=False)
+                if requirement in failed:
+                    pending[requirement] = records
+                    continue
+                rows.append((workbook_key, sheet, requirement, hashes[requirement], len(positions), records, now))
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO legend_mapping (workbook_key, sheet, requirement, rows_hash, "
+                    "row_count, rows_json, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+        counts = {'sheet': sheet, 'recomputed': len(stale) - len(pending), 'failed': len(pending),
+                  'reused': len(requirements) - len(stale)}
+        return self._frame(self._stored_rows(workbook_key, sheet) | pending, requirements), counts
+
+    def _stored_rows(self, workbook_key, sheet):
+        query = "SELECT requirement, rows_json FROM legend_mapping WHERE workbook_key = ? AND sheet = ?"
+        with self._lock:
+            return dict(self.connection.execute(query, (workbook_key, sheet)).fetchall())
+
+    @staticmethod
+    def _frame(stored, requirements):
+        records = [record for requirement in requirements if requirement in stored
+                   for record in json.loads(stored[requirement])]
+        return pd.DataFrame.from_records(records) if records else pd.DataFrame(columns=[REQUIREMENT_COLUMN])
+
+    def load(self, workbook_key, sheet, requirements=None):
+        """ Stored rows of one sheet as a DataFrame, in requirement order. """
+        stored = self._stored_rows(workbook_key, sheet)
+        return self._frame(stored, list(stored) if requirements is None else requirements)
+
+    def export(self, workbook_key=None):
+        """ Every stored row (one per matched anchor row) with its workbook key and sheet. """
+        query = "SELECT workbook_key, sheet, rows_json FROM legend_mapping"
+        params = ()
+        if workbook_key is not None:
+            query += " WHERE workbook_key = ?"
+            params = (workbook_key,)
+        query += " ORDER BY workbook_key, sheet"
+        with self._lock:
+            stored = self.connection.execute(query, params).fetchall()
+        records = [{'workbook_key': key, 'sheet': sheet, **record}
+                   for key, sheet, rows_json in stored for record in json.loads(rows_json)]
+        return pd.DataFrame.from_records(records)
+
+    def summary(self):
+        """ Requirement and row counts per workbook and sheet. """
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT workbook_key, sheet, COUNT(*) AS requirements, SUM(row_count > 0) AS matched, "
+                "SUM(row_count) AS rows, MAX(updated_at) AS updated_at "
+                "FROM legend_mapping GROUP BY workbook_key, sheet", self.connection)
+
+
+# Example usage
+if __name__ == "__main__":
+    matched = pd.DataFrame({
+        'Requirement': ['A046', 'A046', 'B028-1'],
+        'Ref ID': ['id-1', 'id-2', 'id-3'],
+        'Anchor Text': ['A046—Drive Train Domain Control Unit', '0A046—Circuit Test',
+                        'B028-1—Battery Cut-Off Relay'],
+    })
+
+    def keep_first(frame):
+        print(f"  computing {frame['Requirement'].nunique()} requirements")
+        return frame.groupby('Requirement', sort=False).head(1)
+
+    with LegendMappingStore(':memory:') as store:
+        rows, counts = store.sync('workbook', 'Sheet1', matched, ['A046', 'B028-1'], keep_first)
+        print(counts)
+        rows, counts = store.sync('workbook', 'Sheet1', matched, ['A046', 'B028-1', 'G001'], keep_first)
+        print(counts)
+        print(rows)
+        print(store.export())
+        print(store.summary())
@@ -0,0 +1,132 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas
+# pip install pyahocorasick   (optional, C implementation of the automaton)
+
+from collections import deque
+
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def normalize_text(text):
+    """ Lower-cases and collapses whitespace (anchor texts contain line breaks). """
+    return ' '.join(str(text).lower().split()) if isinstance(text, str) else ''
+
+
+class RequirementMatcher:
+    """ Aho-Corasick automaton over all requirement strings.
+
+    Each sheet row is scanned once for every requirement at the same time.
+    A match must end at a word boundary and start at one too, except that a
+    code may follow a digit (0A046 matches A046).
+    """
+
+    def __init__(self, requirements):
+        self.requirements = list(dict.fromkeys(r.strip() for r in requirements if r.strip()))
+        self.patterns = [normalize_text(r) for r in self.requirements]
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern_id, pattern in enumerate(self.patterns):
+                ids = self._automaton.get(pattern, [])
+                self._automaton.add_word(pattern, ids + [pattern_id])
+            self._automaton.make_automaton()
+            return
+
+        # goto[state] maps a character to the next state; outputs[state] lists pattern ids
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._outputs[state].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _raw_matches(self, text):
+        """ Yields (end_index, pattern_id) for every occurrence in normalized text. """
+        if ahocorasick is not None:
+            for end, pattern_ids in self._automaton.iter(text):
+                for pattern_id in pattern_ids:
+                    yield end, pattern_id
+            return
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in outputs[state]:
+                yield end, pattern_id
+
+    def scan(self, text):
+        """ Set of pattern ids found in one text, with word-boundary checks. """
+        text = normalize_text(text)
+        found = set()
+        for end, pattern_id in self._raw_matches(text):
+            if pattern_id in found:
+                continue
+            pattern = self.patterns[pattern_id]
+            start = end - len(pattern) + 1
+            after = text[end + 1] if end + 1 < len(text) else ' '
+            before = text[start - 1] if start > 0 else ' '
+            if after.isalnum() and pattern[-1].isalnum():
+                continue
+            if before.isalnum() and pattern[0].isalnum() and not (before.isdigit() and pattern[0].isalpha()):
+                continue
+            found.add(pattern_id)
+        return found
+
+    def match_rows(self, texts):
+        """ {requirement: sorted row positions} after one pass over all rows. """
+        rows = [[] for _ in self.patterns]
+        for row, text in enumerate(texts):
+            for pattern_id in self.scan(text):
+                rows[pattern_id].append(row)
+        return {requirement: np.array(positions, dtype=np.int64)
+                for requirement, positions in zip(self.requirements, rows)}
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    texts = [
+        "0A046—Drive Train Domain Control Unit (5-V Output) Circuit Test",
+        "X870-8—Power Supply for Drive Train and Transmission Control Unit (A046, A062, A065)",
+        "B028-1—Battery Cut-Off\nRelay",
+        "A0461—Not a match",
+        "Ground Point (Cab)",
+    ] * 20000
+    requirements = ["A046", "B028-1", "Battery Cut-Off Relay", "Ground Point (Cab)", "Ground Point",
+                    "Drive Train Domain Control Unit", "Alternator"]
+
+    start = time.perf_counter()
+    matcher = RequirementMatcher(requirements)
+    matches = matcher.match_rows(texts)
+    print(f"Scanned {len(texts)} rows in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({'pyahocorasick' if ahocorasick else 'pure Python'})")
+    for requirement, rows in matches.items():
+        print(f"{requirement}: {len(rows)} rows")
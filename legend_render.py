@@ -0,0 +1,87 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install pandas
+
+import html
+
+import pandas as pd
+
+REQUIREMENT_COLUMN = 'Requirement'
+NO_MATCHES_HTML = "<div>No matching entries found.</div>"
+
+
+def _field_html(data_frame, column):
+    """ '<p><strong>column:</strong> value</p>' for every row, escaped; empty for missing values. """
+    values = data_frame[column]
+    text = values.astype(object).where(values.notna(), '').astype(str).map(html.escape)
+    label = f"        <p><strong>{html.escape(str(column))}:</strong> "
+    return (label + text + "</p>\n").where(values.notna(), "")
+
+
+def render_legend_html(matched, requirements=None, columns=None, requirement_column=REQUIREMENT_COLUMN,
+                       show_unmatched=False):
+    """ Renders matched anchor rows as the <h2>/<div> legend markup shown in mapping_copy.ipynb.
+
+    matched is the frame from matched_rows_frame (one row per match, with a
+    requirement column). Requirements appear in the given order, each as an
+    <h2> followed by one <div> per row with a <p> per column; the requirement
+    column comes last, as in the model's answers.
+    """
+    if requirements is None:
+        requirements = list(dict.fromkeys(matched[requirement_column]))
+    if columns is None:
+        columns = [column for column in matched.columns if column != requirement_column]
+    columns = list(columns) + [requirement_column]
+
+    # Build every row's <div> with vectorised string concatenation
+    body = pd.Series("", index=matched.index)
+    for column in columns:
+        body = body + _field_html(matched, column)
+    blocks = {}
+    for requirement, block in zip(matched[requirement_column], "    <div>\n" + body + "    </div>\n"):
+        blocks.setdefault(requirement, []).append(block)
+
+    parts = []
+    for requirement in requirements:
+        if requirement in blocks:
+            parts.append(f"    <h2>{html.escape(requirement)}</h2>\n" + "".join(blocks[requirement]))
+        elif show_unmatched:
+            parts.append(f"    <h2>{html.escape(requirement)}</h2>\n    <div><p>No matching entries found.</p></div>\n")
+    if not parts:
+        return NO_MATCHES_HTML
+    return "<div>\n" + "".join(parts) + "</div>"
+
+
+def filter_confirmed(matched, confirmed, id_column='Ref ID', requirement_column=REQUIREMENT_COLUMN):
+    """ Keeps the matched rows whose id the model listed under their requirement.
+
+    confirmed is {requirement: [ids]} as merged by merge_structured_fragments.
+    Only requirements present in it are filtered: the rows of a requirement
+    whose answer was missing or could not be parsed are all kept.
+    """
+    if id_column not in matched.columns:
+        return matched
+    pairs = {(requirement, str(row_id)) for requirement, ids in confirmed.items() for row_id in ids}
+    keep = [requirement not in confirmed or (requirement, str(row_id)) in pairs
+            for requirement, row_id in zip(matched[requirement_column], matched[id_column])]
+    return matched[keep]
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    matched = pd.DataFrame({
+        'Requirement': ['A046', 'A046', 'B028-1'] * 2000,
+        'Ref ID': [f'id-{i}' for i in range(6000)],
+        'SGML ID': [f'sgml-{i}' for i in range(6000)],
+        'Anchor Text': ['A046—Drive Train Domain Control Unit', '0A046—Circuit Test <5-V>',
+                        'B028-1—Battery Cut-Off Relay'] * 2000,
+    })
+    matched['Requirement'] = matched['Requirement'] + '-' + (matched.index // 3).astype(str)
+
+    start = time.perf_counter()
+    page = render_legend_html(matched, columns=['Ref ID', 'SGML ID', 'Anchor Text'])
+    print(f"Rendered {matched['Requirement'].nunique()} requirements in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    print(page[:600])
@@ -0,0 +1,160 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas scikit-learn
+
+import os
+import pickle
+import threading
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import make_pipeline, make_union
+from sklearn.preprocessing import Normalizer
+
+from legend_fuzzy import DEFAULT_INDEX_DIR, column_key
+from legend_index import ANCHOR_TEXT_COLUMN
+
+DEFAULT_DIMENSIONS = 128
+# Below this many SVD dimensions (sheets of a few dozen rows) every text lands
+# close to some anchor and cosine scores near 1.0 mean nothing, so the index
+# returns no candidates at all
+MIN_DIMENSIONS = 32
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_TOP_K = 5
+
+
+def _clean(texts):
+    return [text if isinstance(text, str) else '' for text in texts]
+
+
+def build_embedder(texts, dimensions=DEFAULT_DIMENSIONS):
+    """ Fits a CPU-only text embedder: word + character TF-IDF reduced with SVD (LSA), L2-normalised.
+
+    Character n-grams tie abbreviations and spelling variants together, and
+    the SVD folds co-occurring terms into shared dimensions, so requirements
+    can match anchors they share no exact token with.
+    """
+    tfidf = make_union(
+        TfidfVectorizer(analyzer='word', sublinear_tf=True, token_pattern=r'[A-Za-z0-9]+'),
+        TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 4), sublinear_tf=True),
+    )
+    features = tfidf.fit_transform(_clean(texts))
+    dimensions = min(dimensions, features.shape[0] - 1, features.shape[1] - 1)
+    if dimensions < 2:
+        # Too few rows to reduce: keep the raw TF-IDF space
+        embedder = make_pipeline(tfidf, Normalizer())
+        return embedder, embedder.named_steps['normalizer'].fit_transform(features)
+    svd = TruncatedSVD(n_components=dimensions, random_state=0)
+    embedder = make_pipeline(tfidf, svd, Normalizer())
+    vectors = embedder.named_steps['normalizer'].fit_transform(svd.fit_transform(features))
+    return embedder, vectors
+
+
+class SemanticIndex:
+    """ Nearest-neighbour search over anchor text embeddings.
+
+    Vectors live in a float32 .npy file opened as a memory map, so the index
+    loads instantly and pages in only what a search touches. Search is a
+    brute-force dot product, which stays in the millisecond range for the
+    sheet sizes involved (100k rows x 128 dimensions is 51 MB).
+    """
+
+    def __init__(self, embedder, vectors):
+        self.embedder = embedder
+        self.vectors = vectors
+        svd = embedder.named_steps.get('truncatedsvd')
+        # 0 when the sheet was too small to reduce at all
+        self.dimensions = svd.n_components if svd is not None else 0
+
+    @classmethod
+    def build(cls, texts, dimensions=DEFAULT_DIMENSIONS):
+        embedder, vectors = build_embedder(texts, dimensions)
+        if hasattr(vectors, 'toarray'):
+            vectors = vectors.toarray()
+        return cls(embedder, np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def save(self, folder):
+        # Each file is written to a temporary name and moved into place, the
+        # embedder last: load() is only attempted once embedder.pkl exists, so
+        # it never sees a half-written index
+        os.makedirs(folder, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for name, write in (('vectors.npy', lambda file: np.save(file, self.vectors)),
+                            ('embedder.pkl', lambda file: pickle.dump(self.embedder, file))):
+            path = os.path.join(folder, name)
+            with open(path + suffix, 'wb') as file:
+                write(file)
+            os.replace(path + suffix, path)
+
+    @classmethod
+    def load(cls, folder):
+        with open(os.path.join(folder, 'embedder.pkl'), 'rb') as file:
+            embedder = pickle.load(file)
+        return cls(embedder, np.load(os.path.join(folder, 'vectors.npy'), mmap_mode='r'))
+
+    def embed(self, texts):
+        vectors = self.embedder.transform(_clean(texts))
+        if hasattr(vectors, 'toarray'):
+            vectors = vectors.toarray()
+        return np.asarray(vectors, dtype=np.float32)
+
+    def search(self, requirements, top_k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD):
+        """ {requirement: (rows, cosine scores)} of the closest anchor texts, best first.
+
+        Empty for every requirement when the index has fewer than MIN_DIMENSIONS dimensions.
+        """
+        requirements = list(requirements)
+        if not requirements or not len(self.vectors) or self.dimensions < MIN_DIMENSIONS:
+            return {requirement: (np.empty(0, dtype=np.int64), np.empty(0)) for requirement in requirements}
+        scores = self.embed(requirements) @ self.vectors.T
+        top_k = min(top_k, scores.shape[1])
+        results = {}
+        for requirement, row_scores in zip(requirements, scores):
+            rows = np.argpartition(-row_scores, top_k - 1)[:top_k]
+            rows = rows[row_scores[rows] >= threshold]
+            rows = rows[np.argsort(-row_scores[rows], kind='stable')]
+            results[requirement] = (rows.astype(np.int64), row_scores[rows])
+        return results
+
+    def lookup_all(self, requirements, top_k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD):
+        """ {requirement: row positions} for every requirement. """
+        return {requirement: rows for requirement, (rows, _) in self.search(requirements, top_k, threshold).items()}
+
+
+def get_semantic_index(data_frame, column=ANCHOR_TEXT_COLUMN, index_dir=DEFAULT_INDEX_DIR,
+                       dimensions=DEFAULT_DIMENSIONS):
+    """ Loads the sheet's semantic index from disk, building and saving it on first use. """
+    if not index_dir:
+        return SemanticIndex.build(data_frame[column].tolist(), dimensions)
+    folder = os.path.join(index_dir, f'semantic_{column_key(data_frame, column)}_{dimensions}')
+    if os.path.exists(os.path.join(folder, 'embedder.pkl')):
+        return SemanticIndex.load(folder)
+
+    index = SemanticIndex.build(data_frame[column].tolist(), dimensions)
+    index.save(folder)
+    return index
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    texts = [
+        "S012—Cab Roof Switch Panel",
+        "X870-8—Power Supply for Drive Train and Transmission Control Unit (A046, A062, A065)",
+        "B028-1—Battery Cut-Off Relay",
+        "W001—Wiring Circuit Diagram, Cab",
+        "G004—Alternator Charging Ground",
+    ] * 20000
+
+    start = time.perf_counter()
+    index = SemanticIndex.build(texts)
+    print(f"Embedded {len(texts)} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    requirements = ["Cab Switch", "Circuit", "Alternator", "Battery Cutoff"]
+    start = time.perf_counter()
+    results = index.search(requirements, top_k=1)
+    print(f"Searched {len(requirements)} requirements in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for requirement, (rows, scores) in results.items():
+        print(requirement, "->", [(texts[row], round(float(score), 2)) for row, score in zip(rows, scores)])
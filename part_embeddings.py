@@ -0,0 +1,393 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from image_ingest import ingest_images, load_thumbnail, scan_images
+
+DEFAULT_INDEX_DIR = 'part_index'
+# Bumped whenever embeddings change, so old indexes are rebuilt
+INDEX_VERSION = 2
+EMBEDDING_SIZE = 128
+CELL_SIZE = 16
+ORIENTATIONS = 9
+
+# 2x2-cell blocks with a one-cell stride over an 8x8 cell grid -> 7 * 7 * 36 = 1764 values
+EMBEDDING_DIMENSIONS = (EMBEDDING_SIZE // CELL_SIZE - 1) ** 2 * 4 * ORIENTATIONS
+
+_CELL_IDS = ((np.arange(EMBEDDING_SIZE)[:, None] // CELL_SIZE) * (EMBEDDING_SIZE // CELL_SIZE)
+             + np.arange(EMBEDDING_SIZE)[None, :] // CELL_SIZE).ravel()
+
+
+def _crop_to_object(gray, margin=0.05):
+    """ Crops to the part, taking the median border value as the background. """
+    border = np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])
+    mask = cv2.absdiff(gray, np.full_like(gray, int(np.median(border)))) > 25
+    ys, xs = np.nonzero(mask)
+    if len(ys) < 0.01 * gray.size:
+        return gray
+    pad_y, pad_x = int(gray.shape[0] * margin), int(gray.shape[1] * margin)
+    return gray[max(ys.min() - pad_y, 0):ys.max() + pad_y + 1, max(xs.min() - pad_x, 0):xs.max() + pad_x + 1]
+
+
+def _square(gray, size=EMBEDDING_SIZE):
+    """ Resizes keeping the aspect ratio and pads to size x size with the edge values. """
+    scale = size / max(gray.shape)
+    height, width = max(1, round(gray.shape[0] * scale)), max(1, round(gray.shape[1] * scale))
+    resized = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+    top, left = (size - height) // 2, (size - width) // 2
+    return cv2.copyMakeBorder(resized, top, size - height - top, left, size - width - left, cv2.BORDER_REPLICATE)
+
+
+def hog_descriptor(gray):
+    """ Histogram of oriented gradients of a square grey image (Dalal-Triggs layout, L2-Hys blocks). """
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=1)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=1)
+    magnitude, angle = cv2.cartToPolar(gx, gy, angleInDegrees=True)
+    bins = (angle.ravel() % 180 // (180 / ORIENTATIONS)).astype(np.int64) % ORIENTATIONS
+    cells = EMBEDDING_SIZE // CELL_SIZE
+    hist = np.bincount(_CELL_IDS * ORIENTATIONS + bins, weights=magnitude.ravel(),
+                       minlength=cells * cells * ORIENTATIONS).reshape(cells, cells, ORIENTATIONS)
+
+    blocks = np.concatenate([hist[:-1, :-1], hist[:-1, 1:], hist[1:, :-1], hist[1:, 1:]], axis=-1)
+    blocks /= np.linalg.norm(blocks, axis=-1, keepdims=True) + 1e-6
+    blocks = np.minimum(blocks, 0.2)
+    blocks /= np.linalg.norm(blocks, axis=-1, keepdims=True) + 1e-6
+    return blocks.ravel().astype(np.float32)
+
+
+def embed_image(image):
+    """ L2-normalised float32 shape descriptor (HOG) of a BGR image.
+
+    Renders and photos differ in color, texture and rust, so the descriptor
+    only looks at gradients of the contrast-equalised, cropped grey image.
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gray = _square(_crop_to_object(gray))
+    gray = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4)).apply(gray)
+    vector = hog_descriptor(gray)
+    return vector / max(np.linalg.norm(vector), 1e-6)
+
+
+class _IndexFileLock:
+    """ Exclusive lock on index_dir/.lock shared by every process using the index.
+
+    Held by update(), compact() and rebuilds, so a process never appends to
+    or rewrites a vectors file another one has just replaced. The OS drops
+    the lock if its holder dies.
+    """
+
+    def __init__(self, index_dir):
+        self.path = os.path.join(index_dir, '.lock')
+        self.file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a+b')
+        if os.name == 'nt':
+            import msvcrt
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting
+                    pass
+        else:
+            import fcntl
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if os.name == 'nt':
+            import msvcrt
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
+
+
+def list_graphics(graphics_folder):
+    """ [(part_number, image path, mtime_ns, size)] for every rendered graphic, in a stable order. """
+    return [entry for entry in scan_images(graphics_folder) if entry[0]]
+
+
+class PartIndex:
+    """ Incrementally maintained embeddings of every rendered graphic with their part labels.
+
+    vectors-<n>.f32 is an append-only (N, D) float32 matrix opened as a memory
+    map; meta.json names it and lists each row's render path, part, mtime,
+    size and hash, plus the same stamp for renders that failed to decode.
+    update() embeds only new or changed renders and tombstones changed or
+    deleted rows, and compact() rewrites the matrix without the dead rows.
+    Both hold a lock file in index_dir and start by re-reading meta.json, so
+    several processes (e.g. a watcher and a batch run) can share one index.
+    Identification is a brute-force dot product over the live rows.
+    """
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._compacting = None
+        self._load_meta()
+
+    def _load_meta(self):
+        """ Reads the row table and current vectors file from meta.json (empty if there is none). """
+        self.parts = []
+        self.rows = []
+        self.failed = {}
+        self.vectors_file = 'vectors-0.f32'
+        meta_path = os.path.join(self.index_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            if meta.get('version') == INDEX_VERSION and meta.get('dimensions') == EMBEDDING_DIMENSIONS:
+                self.parts, self.rows, self.vectors_file = meta['parts'], meta['rows'], meta['vectors_file']
+                self.failed = meta.get('failed', {})
+        self._refresh()
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.index_dir, self.vectors_file)
+
+    def _refresh(self):
+        """ Re-opens the vector memory map and rebuilds the label array from the row table. """
+        part_ids = {part_number: i for i, part_number in enumerate(self.parts)}
+        self.labels = np.array([part_ids[row['part']] if row else -1 for row in self.rows], dtype=np.int32)
+        self.paths = [row['path'] if row else None for row in self.rows]
+        if self.rows:
+            self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r',
+                                     shape=(len(self.rows), EMBEDDING_DIMENSIONS))
+        else:
+            self.vectors = np.empty((0, EMBEDDING_DIMENSIONS), np.float32)
+
+    def _save_meta(self):
+        path = os.path.join(self.index_dir, 'meta.json')
+        with open(path + '.tmp', 'w') as file:
+            json.dump({'version': INDEX_VERSION, 'dimensions': EMBEDDING_DIMENSIONS, 'vectors_file': self.vectors_file,
+                       'parts': self.parts, 'rows': self.rows, 'failed': self.failed}, file)
+        os.replace(path + '.tmp', path)
+
+    def update(self, graphics_folder, workers=None):
+        """ Brings the index in line with the render library. Returns counts.
+
+        A render whose mtime and size are unchanged is skipped without being
+        read; otherwise its SHA-1 decides whether it really has to be
+        re-embedded. Renders to embed are decoded in a process pool. Renders
+        that fail to decode are remembered by the same stamp and hash, and only
+        retried once they change.
+        """
+        with _IndexFileLock(self.index_dir), self._lock:
+            # Another process may have updated or compacted the index since we last looked
+            self._load_meta()
+            live = {row['path']: i for i, row in enumerate(self.rows) if row}
+            seen = set()
+            pending = []
+            counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'failed': 0}
+
+            for part_number, path, mtime_ns, size in list_graphics(graphics_folder):
+                seen.add(path)
+                row_id = live.get(path)
+                row = self.rows[row_id] if row_id is not None else None
+                failed = self.failed.get(path)
+                stamp = row or failed
+                if stamp and stamp['mtime_ns'] == mtime_ns and stamp['size'] == size:
+                    counts['failed' if failed else 'unchanged'] += 1
+                    continue
+
+                try:
+                    with open(path, 'rb') as file:
+                        digest = hashlib.sha1(file.read()).hexdigest()
+                except FileNotFoundError:
+                    # Deleted since the scan: treat it as removed
+                    seen.discard(path)
+                    continue
+                if stamp and stamp['sha1'] == digest and stamp['part'] == part_number:
+                    # Touched but identical: only refresh the stamp
+                    stamp.update(mtime_ns=mtime_ns, size=size)
+                    counts['failed' if failed else 'unchanged'] += 1
+                    continue
+                pending.append((row_id, {'path': path, 'part': part_number, 'mtime_ns': mtime_ns,
+                                         'size': size, 'sha1': digest}))
+
+            new_rows, new_vectors = [], []
+            embeddings = ingest_images([row['path'] for _, row in pending], embed_image, workers)
+            for (row_id, row), vector in zip(pending, embeddings):
+                if vector is None:
+                    print(f"Skipping unreadable graphic: {row['path']}")
+                    self.failed[row['path']] = row
+                    counts['failed'] += 1
+                    if row_id is not None:
+                        # Its old embedding no longer describes the file
+                        self.rows[row_id] = None
+                        counts['removed'] += 1
+                    continue
+                self.failed.pop(row['path'], None)
+                if row_id is not None:
+                    self.rows[row_id] = None
+                    counts['changed'] += 1
+                else:
+                    counts['added'] += 1
+                if row['part'] not in self.parts:
+                    self.parts.append(row['part'])
+                new_vectors.append(vector)
+                new_rows.append(row)
+
+            for path, row_id in live.items():
+                if path not in seen:
+                    self.rows[row_id] = None
+                    counts['removed'] += 1
+            self.failed = {path: stamp for path, stamp in self.failed.items() if path in seen}
+
+            if new_vectors:
+                # Write right after the rows meta.json knows about, dropping any
+                # bytes left by an update that died before saving its meta
+                mode = 'r+b' if os.path.exists(self._vectors_path) else 'wb'
+                with open(self._vectors_path, mode) as file:
+                    file.seek(len(self.rows) * EMBEDDING_DIMENSIONS * 4)
+                    file.write(np.vstack(new_vectors).astype(np.float32).tobytes())
+                    file.truncate()
+                self.rows.extend(new_rows)
+            self._save_meta()
+            self._refresh()
+        return counts
+
+    def dead_fraction(self):
+        return float(np.mean(self.labels < 0)) if len(self.labels) else 0.0
+
+    def compact(self):
+        """ Rewrites the vectors without tombstoned rows into a new file and switches to it.
+
+        The index lock file is held throughout, so no process updates the index
+        meanwhile; the copy is made outside the thread lock, so searches in
+        this process continue until the switch.
+        """
+        with _IndexFileLock(self.index_dir):
+            with self._lock:
+                self._load_meta()
+                vectors, rows = self.vectors, self.rows
+                keep = np.flatnonzero(self.labels >= 0)
+                if len(keep) == len(rows):
+                    return
+                generation = int(self.vectors_file.split('-')[1].split('.')[0]) + 1
+                new_file = f'vectors-{generation}.f32'
+
+            # Copy the live rows in slices so a large matrix never sits in memory twice
+            new_path = os.path.join(self.index_dir, new_file)
+            with open(new_path, 'wb') as file:
+                for start in range(0, len(keep), 4096):
+                    file.write(np.ascontiguousarray(vectors[keep[start:start + 4096]]).tobytes())
+
+            with self._lock:
+                self.rows = [rows[i] for i in keep]
+                used = {row['part'] for row in self.rows}
+                self.parts = [part_number for part_number in self.parts if part_number in used]
+                self.vectors_file = new_file
+                self._save_meta()
+                self._refresh()
+            for name in os.listdir(self.index_dir):
+                if name.startswith('vectors-') and name != new_file:
+                    try:
+                        os.remove(os.path.join(self.index_dir, name))
+                    except OSError:
+                        # Still memory-mapped somewhere (Windows); removed by a later compaction
+                        pass
+
+    def compact_in_background(self, min_dead_fraction=0.25):
+        """ Starts compact() on a thread once enough rows are dead; searches keep working meanwhile. """
+        if self.dead_fraction() < min_dead_fraction:
+            return None
+        if self._compacting is not None and self._compacting.is_alive():
+            return self._compacting
+        self._compacting = threading.Thread(target=self.compact, daemon=True)
+        self._compacting.start()
+        return self._compacting
+
+    def identify(self, image, top_k=3):
+        """ [(part_number, similarity, closest render path)] for the best matching parts.
+
+        Each part is scored by its most similar render, since a photo shows
+        the part from one viewpoint only.
+        """
+        return self.identify_vector(embed_image(image), top_k)
+
+    def identify_vector(self, query, top_k=3):
+        """ Like identify(), for a photo already embedded with embed_image. """
+        with self._lock:
+            vectors, labels, paths, parts = self.vectors, self.labels, self.paths, self.parts
+        live = np.flatnonzero(labels >= 0)
+        if not len(live):
+            return []
+        scores = np.full(len(labels), -np.inf, dtype=np.float32)
+        scores[live] = np.asarray(vectors[live]) @ query
+        best = np.full(len(parts), -np.inf, dtype=np.float32)
+        np.maximum.at(best, labels[live], scores[live])
+        order = [part_id for part_id in np.argsort(-best)[:top_k] if np.isfinite(best[part_id])]
+        results = []
+        for part_id in order:
+            rows = np.flatnonzero(labels == part_id)
+            row = rows[np.argmax(scores[rows])]
+            results.append((parts[part_id], float(best[part_id]), paths[row]))
+        return results
+
+
+def get_part_index(graphics_folder, index_dir=DEFAULT_INDEX_DIR, rebuild=False):
+    """ Opens the part index in index_dir and brings it up to date with the render library. """
+    if rebuild:
+        with _IndexFileLock(index_dir):
+            for name in os.listdir(index_dir):
+                if name == 'meta.json' or name.startswith('vectors-'):
+                    os.remove(os.path.join(index_dir, name))
+    index = PartIndex(index_dir)
+    counts = index.update(graphics_folder)
+    if counts['added'] or counts['changed'] or counts['removed']:
+        print(f"Part index updated: {counts}")
+    index.compact_in_background()
+    return index
+
+
+def watch_graphics(graphics_folder, index_dir=DEFAULT_INDEX_DIR, interval=5.0):
+    """ Keeps the part index current by re-scanning the render library every `interval` seconds. """
+    index = PartIndex(index_dir)
+    print(f"Watching {graphics_folder} (Ctrl+C to stop)")
+    try:
+        while True:
+            counts = index.update(graphics_folder)
+            if counts['added'] or counts['changed'] or counts['removed']:
+                print(f"{time.strftime('%H:%M:%S')} part index updated: {counts}")
+                index.compact_in_background()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1] == '--watch':
+        watch_graphics(sys.argv[2])
+        sys.exit()
+
+    graphics_folder, photo_path = sys.argv[1], sys.argv[2]
+    start = time.perf_counter()
+    index = get_part_index(graphics_folder)
+    print(f"Index of {int(np.sum(index.labels >= 0))} renders ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    matches = index.identify(load_thumbnail(photo_path))
+    print(f"Identified in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for part_number, score, render in matches:
+        print(f"{part_number}: {score:.3f} ({render})")
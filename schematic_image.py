@@ -0,0 +1,77 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+import base64
+import mmap
+
+import cv2
+import numpy as np
+
+# Magic bytes of the formats the model upload accepts
+_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'BM', 'BMP'),
+]
+
+
+class SchematicImage:
+    """ A drawing read from disk exactly once.
+
+    The file is memory-mapped; the encoded bytes are used as-is for the model
+    upload and the pixel array is decoded from the same buffer on first access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            try:
+                self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                self._buffer = b''
+        self._pixels = None
+        self._base64 = None
+
+    @property
+    def data(self):
+        """ The original encoded file contents (memory-mapped). """
+        return self._buffer
+
+    @property
+    def format(self):
+        """ Image format detected from the file signature, e.g. 'PNG', or None. """
+        header = bytes(self._buffer[:12])
+        if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+            return 'WEBP'
+        return next((name for magic, name in _SIGNATURES if header.startswith(magic)), None)
+
+    @property
+    def pixels(self):
+        """ BGR pixel array, decoded lazily and cached (same layout as cv2.imread). """
+        if self._pixels is None:
+            encoded = np.frombuffer(self._buffer, dtype=np.uint8)
+            self._pixels = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+            del encoded  # release the export so the mmap can be closed
+            if self._pixels is None:
+                raise ValueError(f"Could not decode image: {self.path}")
+        return self._pixels
+
+    def base64(self):
+        """ Base64 of the original encoded bytes, for the image_url upload. """
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self._buffer).decode("utf-8")
+        return self._base64
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,8 +1,5 @@
 import os
 import json
-import base64
-from PIL import Image
-import io
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 from src.encrypt import decrypt_data
@@ -10,7 +7,10 @@ from src.auth_helpers import get_access_token
 from utils.chat_model import AIGatewayLangchainChatOpenAI
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
+from dominant_colors import compute_dominant_colors
+from color_preprocess import preprocess_wire_colors
+from wire_color_checkpoint import make_model_resolver, run_local_checkpoint3
+from schematic_image import SchematicImage
 import matplotlib.pyplot as plt
 import webcolors
 
@@ -56,14 +56,15 @@ def invoke_model(image_base64, prompt):
     return response.content
 
 def convert_image(image_path):
-    image = Image.open(image_path)
-    if image.format not in ["PNG", "JPEG", "GIF", "WEBP"]:
-        print(f"Unsupported image format: {image.format}")
+    # Accepts a path or an already opened SchematicImage; the original encoded
+    # bytes are uploaded as-is, so nothing is decoded here
+    if not isinstance(image_path, SchematicImage):
+        with SchematicImage(image_path) as image:
+            return convert_image(image)
+    if image_path.format not in ["PNG", "JPEG", "GIF", "WEBP"]:
+        print(f"Unsupported image format: {image_path.format}")
         return None
-    buffered = io.BytesIO()
-    image.save(buffered, format=image.format)
-    image_data = buffered.getvalue()
-    return base64.b64encode(image_data).decode("utf-8")
+    return image_path.base64()
 
 def process_image_with_prompt(image_path, prompt):
     image_base64 = convert_image(image_path)
@@ -75,7 +76,7 @@ def process_image_with_prompt(image_path, prompt):
 
 def remove_black_edges(image_path):
     """ Removes black edges to keep only colored wires. """
-    image = cv2.imread(image_path)
+    image = image_path.pixels if isinstance(image_path, SchematicImage) else cv2.imread(image_path)
     hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
  
     # Define black color range (adjust threshold if needed)
@@ -98,15 +99,10 @@ def enhance_colors(image):
     enhanced_image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
     return enhanced_image
  
-def extract_dominant_colors(image, k=5):
-    """ Extracts dominant colors using K-Means clustering. """
+def extract_dominant_colors(image, k=5, method="histogram"):
+    """ Extracts dominant colors (see dominant_colors.py for the available methods). """
     image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    pixels = image.reshape(-1, 3)
- 
-    kmeans = KMeans(n_clusters=k, random_state=0, n_init=10)
-    kmeans.fit(pixels)
-    
-    dominant_colors = kmeans.cluster_centers_.astype(int)
+    dominant_colors, _ = compute_dominant_colors(image, k=k, method=method)
     return dominant_colors
  
 # def closest_color(rgb_tuple):
@@ -157,19 +153,20 @@ def format_colors_for_gpt(dominant_colors):
 # Example usage
 
 image_path_1 = r"""C:\Users\W4FGXUV\Downloads\Graphics_Quality_Check\Graphics_Quality_Check\Schematics\image.png"""
+# Read and decode the drawing once; color analysis and the model upload share it
+schematic = SchematicImage(image_path_1)
 # prompt = '''Extract the following parameters from the provided graphics in json format along with parameter and value:
 #         1. callout
 #         2. dpi
 #         3. Callout Font
 #         4. Image Size '''
 
-filtered_image = remove_black_edges(image_path_1)
- 
-# Step 2: Enhance colors
-enhanced_image = enhance_colors(filtered_image)
+# Steps 1-2: Remove black edges and enhance colors in one fused HSV pass
+# (same output as remove_black_edges + enhance_colors, already in RGB)
+preprocessed = preprocess_wire_colors(schematic.pixels)
  
 # Step 3: Extract dominant colors
-dominant_colors = extract_dominant_colors(enhanced_image, k=5)
+dominant_colors, _ = compute_dominant_colors(preprocessed.image, k=5)
  
 # Step 4: Generate formatted color data
 color_info = format_colors_for_gpt(dominant_colors)
@@ -223,7 +220,21 @@ Based on this verification, the following wires have incorrect colors according
 - **6506** (Red) should be Blue.,
  
  '''
-result = process_image_with_prompt(image_path_1, prompt)
+# Checkpoint 3 can run locally: only wires whose color can't be determined
+# from the pixels are sent to the model, as small crops
+USE_LOCAL_CHECKPOINT3 = True
+
+if USE_LOCAL_CHECKPOINT3:
+    try:
+        result, _, _ = run_local_checkpoint3(schematic.pixels,
+                                             resolve_ambiguous=make_model_resolver(invoke_model))
+    except (ImportError, OSError) as e:
+        # The wire labels are read with OCR, which needs pytesseract and the
+        # Tesseract binary; without them the model checks the whole schematic
+        print(f"Local checkpoint 3 unavailable ({e}); using the model instead")
+        result = process_image_with_prompt(schematic, prompt)
+else:
+    result = process_image_with_prompt(schematic, prompt)
 print(result)
 
 
@@ -0,0 +1,157 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas openpyxl xlrd
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from wire_color_validation import validate_wire_colors_bulk
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def _iter_excel_chunks(path, chunk_size, columns, sheet_name=None):
+    """ Streams an .xlsx sheet in DataFrame chunks with openpyxl's read-only reader. """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else '' for value in next(rows, ())]
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise KeyError(f"Columns not found in {path}: {missing}")
+        positions = [header.index(column) for column in columns]
+
+        chunk = []
+        for row in rows:
+            chunk.append([row[i] if i < len(row) else None for i in positions])
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=columns, dtype=object)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _iter_xls_chunks(path, chunk_size, columns, sheet_name=None):
+    """ Legacy .xls has no streaming reader: the sheet is read whole with xlrd and sliced. """
+    frame = pd.read_excel(path, sheet_name=sheet_name or 0, usecols=columns, dtype=object, engine='xlrd')
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+
+def iter_wire_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, code_column='code',
+                     color_column='actual_color', sheet_name=None):
+    """ Yields DataFrames of at most chunk_size rows holding the code and color columns. """
+    columns = [code_column, color_column]
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _iter_excel_chunks(path, chunk_size, columns, sheet_name)
+    elif path.lower().endswith('.xls'):
+        yield from _iter_xls_chunks(path, chunk_size, columns, sheet_name)
+    else:
+        yield from pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False,
+                               chunksize=chunk_size)
+
+
+def validate_wire_file(path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, code_column='code',
+                       color_column='actual_color', sheet_name=None, standard=None, tolerance=None):
+    """ Validates a wire list chunk by chunk; writes the incorrect rows and returns summary counts. """
+    summary = {'file': path, 'output': output_path, 'rows': 0, 'validated': 0,
+               'correct': 0, 'incorrect': 0, 'skipped': 0, 'incorrect_by_expected_color': {}}
+    by_color = pd.Series(dtype='int64')
+    write_header = True
+
+    # Start from an empty output so reruns don't append to an old report
+    open(output_path, 'w').close()
+
+    for chunk in iter_wire_chunks(path, chunk_size, code_column, color_column, sheet_name):
+        result = validate_wire_colors_bulk(chunk, code_column=code_column,
+                                           color_column=color_column, standard=standard,
+                                           tolerance=tolerance)
+        incorrect = result[result['mismatch']]
+
+        summary['rows'] += len(chunk)
+        summary['validated'] += len(result)
+        summary['incorrect'] += len(incorrect)
+        by_color = by_color.add(incorrect['expected_color'].value_counts(), fill_value=0)
+
+        if len(incorrect):
+            incorrect.drop(columns='mismatch').to_csv(output_path, mode='a', header=write_header,
+                                                      index=False)
+            write_header = False
+
+    summary['correct'] = summary['validated'] - summary['incorrect']
+    summary['skipped'] = summary['rows'] - summary['validated']
+    summary['incorrect_by_expected_color'] = {str(color): int(count)
+                                              for color, count in by_color.items() if count}
+    return summary
+
+
+def output_names(paths, suffix='_incorrect.csv'):
+    """ One report file name per input, unique even when inputs share a base name.
+
+    Colliding names (h1/export.csv, h2/export.csv) are prefixed with their
+    parent folder, and numbered if that still doesn't tell them apart.
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    names = [stem if stems.count(stem) == 1 else
+             f"{os.path.basename(os.path.dirname(os.path.abspath(path)))}_{stem}"
+             for path, stem in zip(paths, stems)]
+    return [(name if names.count(name) == 1 else f"{name}_{i + 1}") + suffix
+            for i, name in enumerate(names)]
+
+
+def _validate_job(job):
+    return validate_wire_file(**job)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate wire colors in harness wire-list exports (CSV or Excel).")
+    parser.add_argument('inputs', nargs='+', help="CSV/XLSX/XLS wire-list exports")
+    parser.add_argument('--output-dir', default='.', help="Where incorrect-row reports are written")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--code-column', default='code')
+    parser.add_argument('--color-column', default='actual_color')
+    parser.add_argument('--sheet', default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument('--standard', default=None,
+                        help="Color standard for delta E matching, e.g. 'corporate' (default: name match)")
+    parser.add_argument('--tolerance', type=float, default=None, help="Delta E tolerance")
+    parser.add_argument('--workers', type=int, default=1, help="Files validated in parallel")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [{
+        'path': path,
+        'output_path': os.path.join(args.output_dir, output_name),
+        'chunk_size': args.chunk_size,
+        'code_column': args.code_column,
+        'color_column': args.color_column,
+        'sheet_name': args.sheet,
+        'standard': args.standard,
+        'tolerance': args.tolerance,
+    } for path, output_name in zip(args.inputs, output_names(args.inputs))]
+
+    if args.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            summaries = list(pool.map(_validate_job, jobs))
+    else:
+        summaries = [_validate_job(job) for job in jobs]
+
+    with open(os.path.join(args.output_dir, 'summary.json'), 'w') as file:
+        json.dump(summaries, file, indent=2)
+    for summary in summaries:
+        print(f"{summary['file']}: {summary['validated']} validated, "
+              f"{summary['incorrect']} incorrect, {summary['skipped']} skipped")
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from wire_color_checkpoint import DEFAULT_SEGMENT_CLASSES
+from wire_color_lut import classify_pixels
+from wire_segments import SEGMENT_DTYPE
+
+DEFAULT_STRIP_ROWS = 1024
+
+# Per-process state set by the pool initializer
+_worker_lut = None
+
+
+def _attach(name):
+    """ Attaches to a shared memory block created by analyze_tiled. """
+    # Workers share the parent's resource tracker, and its registry is a set, so
+    # attaching here does not change who unlinks the block
+    return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(lut):
+    global _worker_lut
+    _worker_lut = lut
+
+
+def _analyze_strip(task):
+    """ Classifies and labels one row strip of the shared image.
+
+    Writes class ids and strip-local component labels (1..n, 0 = none) into the
+    shared output maps and returns the per-component statistics.
+    """
+    image_name, class_name, label_name, shape, top, bottom, classes, connectivity = task
+    height, width = shape
+    blocks = [_attach(name) for name in (image_name, class_name, label_name)]
+    try:
+        image = np.ndarray((height, width, 3), np.uint8, buffer=blocks[0].buf)[top:bottom]
+        class_map = np.ndarray((height, width), np.uint8, buffer=blocks[1].buf)[top:bottom]
+        labels = np.ndarray((height, width), np.int32, buffer=blocks[2].buf)[top:bottom]
+
+        class_map[:] = classify_pixels(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), _worker_lut)
+        labels[:] = 0
+
+        stats = []
+        next_label = 1
+        for color_class in classes:
+            mask = (class_map == color_class).view(np.uint8)
+            count, local, component_stats, centroids = cv2.connectedComponentsWithStats(
+                mask, connectivity=connectivity, ltype=cv2.CV_32S)
+            if count <= 1:
+                continue
+            np.add(local, next_label - 1, out=labels, where=local > 0)
+
+            component_stats = component_stats[1:]
+            area = component_stats[:, cv2.CC_STAT_AREA].astype(np.int64)
+            x0 = component_stats[:, cv2.CC_STAT_LEFT]
+            y0 = component_stats[:, cv2.CC_STAT_TOP] + top
+            stats.append(np.column_stack([
+                np.full(count - 1, color_class),
+                x0,
+                y0,
+                x0 + component_stats[:, cv2.CC_STAT_WIDTH] - 1,
+                y0 + component_stats[:, cv2.CC_STAT_HEIGHT] - 1,
+                area,
+                # Centroid sums so components split across strips can be merged exactly
+                np.rint(centroids[1:, 0] * area),
+                np.rint((centroids[1:, 1] + top) * area),
+            ]).astype(np.int64))
+            next_label += count - 1
+
+        return np.concatenate(stats) if stats else np.empty((0, 8), dtype=np.int64)
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _find(parents, node):
+    root = node
+    while parents[root] != root:
+        root = parents[root]
+    while parents[node] != root:
+        parents[node], node = root, parents[node]
+    return root
+
+
+def _border_pairs(above, below, above_classes, below_classes, connectivity):
+    """ Pairs of global labels that touch across a strip border. """
+    shifts = (-1, 0, 1) if connectivity == 8 else (0,)
+    pairs = []
+    width = len(above)
+    for shift in shifts:
+        a = above[max(0, -shift):width - max(0, shift)]
+        b = below[max(0, shift):width - max(0, -shift)]
+        ca = above_classes[max(0, -shift):width - max(0, shift)]
+        cb = below_classes[max(0, shift):width - max(0, -shift)]
+        touching = (a >= 0) & (b >= 0) & (ca == cb)
+        pairs.append(np.column_stack([a[touching], b[touching]]))
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def analyze_tiled(image, lut, classes=DEFAULT_SEGMENT_CLASSES, strip_rows=DEFAULT_STRIP_ROWS,
+                  workers=None, min_pixels=20, connectivity=8, return_labels=False):
+    """ Tile-parallel pixel classification and wire segment extraction.
+
+    The BGR image and the output maps live in multiprocessing.shared_memory, so
+    workers read and write them in place. Components cut by strip borders are
+    merged with union-find. The result matches extract_wire_segments on the
+    whole image (segment ids aside). Returns (segments, class_map) or
+    (segments, class_map, labels) with -1 marking pixels outside any segment.
+    """
+    height, width = image.shape[:2]
+    workers = workers or os.cpu_count() or 1
+    strip_rows = max(1, min(strip_rows, height))
+    bounds = [(top, min(top + strip_rows, height)) for top in range(0, height, strip_rows)]
+
+    blocks = [shared_memory.SharedMemory(create=True, size=max(1, height * width * itemsize))
+              for itemsize in (3, 1, 4)]
+    try:
+        shared_image = np.ndarray((height, width, 3), np.uint8, buffer=blocks[0].buf)
+        shared_image[:] = image
+        class_map = np.ndarray((height, width), np.uint8, buffer=blocks[1].buf)
+        labels = np.ndarray((height, width), np.int32, buffer=blocks[2].buf)
+
+        tasks = [(blocks[0].name, blocks[1].name, blocks[2].name, (height, width), top, bottom,
+                  list(classes), connectivity) for top, bottom in bounds]
+        if workers == 1 or len(tasks) == 1:
+            _init_worker(lut)
+            strip_stats = [_analyze_strip(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(lut,)) as pool:
+                strip_stats = list(pool.map(_analyze_strip, tasks))
+
+        # Strip-local label k in strip s becomes global id offsets[s] + k - 1
+        offsets = np.concatenate([[0], np.cumsum([len(stats) for stats in strip_stats])])
+        stats = np.concatenate(strip_stats)
+        parents = list(range(len(stats)))
+
+        for index in range(1, len(bounds)):
+            border = bounds[index][0]
+            above = labels[border - 1].astype(np.int64) + offsets[index - 1] - 1
+            below = labels[border].astype(np.int64) + offsets[index] - 1
+            above[labels[border - 1] == 0] = -1
+            below[labels[border] == 0] = -1
+            for a, b in _border_pairs(above, below, class_map[border - 1], class_map[border],
+                                      connectivity):
+                root_a, root_b = _find(parents, a), _find(parents, b)
+                if root_a != root_b:
+                    parents[max(root_a, root_b)] = min(root_a, root_b)
+
+        roots = np.array([_find(parents, node) for node in range(len(stats))], dtype=np.int64)
+        unique_roots, groups = np.unique(roots, return_inverse=True)
+
+        merged = np.empty((len(unique_roots), 8), dtype=np.int64)
+        merged[:, 0] = stats[unique_roots, 0]
+        for column, reduce in ((1, np.minimum), (2, np.minimum), (3, np.maximum), (4, np.maximum)):
+            merged[:, column] = stats[unique_roots, column]
+            reduce.at(merged[:, column], groups, stats[:, column])
+        for column in (5, 6, 7):
+            merged[:, column] = np.bincount(groups, weights=stats[:, column],
+                                            minlength=len(unique_roots))
+
+        keep = np.flatnonzero(merged[:, 5] >= min_pixels)
+        segments = np.empty(len(keep), dtype=SEGMENT_DTYPE)
+        segments['segment_id'] = np.arange(len(keep))
+        segments['color_class'] = merged[keep, 0]
+        segments['x'] = merged[keep, 1]
+        segments['y'] = merged[keep, 2]
+        segments['width'] = merged[keep, 3] - merged[keep, 1] + 1
+        segments['height'] = merged[keep, 4] - merged[keep, 2] + 1
+        segments['pixel_count'] = merged[keep, 5]
+        segments['cx'] = merged[keep, 6] / merged[keep, 5]
+        segments['cy'] = merged[keep, 7] / merged[keep, 5]
+
+        class_map = class_map.copy()
+        if not return_labels:
+            return segments, class_map
+
+        # Local label -> global component -> final segment id (or -1)
+        group_to_segment = np.full(len(unique_roots), -1, dtype=np.int32)
+        group_to_segment[keep] = segments['segment_id']
+        label_map = np.full((height, width), -1, dtype=np.int32)
+        for index, (top, bottom) in enumerate(bounds):
+            remap = np.concatenate([[-1], group_to_segment[groups[offsets[index]:offsets[index + 1]]]])
+            label_map[top:bottom] = remap[labels[top:bottom]]
+        return segments, class_map, label_map
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from wire_color_lut import get_color_lut
+
+    image = cv2.imread(sys.argv[1])
+    lut = get_color_lut('wire_color_lut.npz', tolerance=25)
+    for workers in (1, os.cpu_count()):
+        start = time.perf_counter()
+        segments, _ = analyze_tiled(image, lut, workers=workers)
+        print(f"{workers} worker(s): {len(segments)} segments in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
@@ -1,34 +1,61 @@
 import os
 import json
-import pandas as pd
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from legend_index import LegendIndex, is_index_query, matched_rows_frame
+from legend_fuzzy import get_trigram_index
+from legend_semantic import get_semantic_index
+from legend_prefilter import RequirementMatcher
+from legend_chunking import map_in_chunks, merge_structured_fragments
+from legend_render import NO_MATCHES_HTML, REQUIREMENT_COLUMN, filter_confirmed, render_legend_html
+from legend_mapping_store import LegendMappingStore
+from workbook_cache import read_excel_cached, workbook_key
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 from src.encrypt import decrypt_data
 from src.auth_helpers import get_access_token
 from utils.chat_model import AIGatewayLangchainChatOpenAI
 
-# Load configuration from JSON and environment
-with open('secret/url.json', 'r') as file:
-    url_data = json.load(file)
-AI_GATEWAY_BASE_URL = url_data.get("ai_gateway")
-issuer_url = url_data.get("issuer_url")
+# Model calls in flight across all sheets and chunks; sheets are mapped
+# concurrently and each one fans its chunks out again, so the cap is global
+MAX_MODEL_CONCURRENCY = 4
+_model_calls = threading.BoundedSemaphore(MAX_MODEL_CONCURRENCY)
 
-# Load the .env file from the specified directory
-load_dotenv('secret/.env')  # Specify the full path to the .env file
+_model = None
+_model_lock = threading.Lock()
 
-# Retrieve and decrypt the environment variables
-loaded_fernet_key = os.getenv('FERNET_KEY').encode()
-loaded_encrypted_client_id = os.getenv('ENCRYPTED_CLIENT_ID').encode()
-loaded_encrypted_client_secret = os.getenv('ENCRYPTED_CLIENT_SECRET').encode()
+def get_model():
+    # Credentials are loaded and the token fetched on the first model call, not
+    # at import, so worker processes that import this module never touch them
+    global _model
+    with _model_lock:
+        if _model is not None:
+            return _model
 
-client_id = decrypt_data(loaded_encrypted_client_id, loaded_fernet_key)
-client_secret = decrypt_data(loaded_encrypted_client_secret, loaded_fernet_key)
+        # Load configuration from JSON and environment
+        with open('secret/url.json', 'r') as file:
+            url_data = json.load(file)
+        AI_GATEWAY_BASE_URL = url_data.get("ai_gateway")
+        issuer_url = url_data.get("issuer_url")
 
-access_token = get_access_token(client_id, client_secret, issuer_url)
+        # Load the .env file from the specified directory
+        load_dotenv('secret/.env')  # Specify the full path to the .env file
 
-model = AIGatewayLangchainChatOpenAI(
-    access_token=access_token, base_url=AI_GATEWAY_BASE_URL, model="o1-2024-12-17", deere_ai_gateway_registration_id="graphics-quality-check"
-)
+        # Retrieve and decrypt the environment variables
+        loaded_fernet_key = os.getenv('FERNET_KEY').encode()
+        loaded_encrypted_client_id = os.getenv('ENCRYPTED_CLIENT_ID').encode()
+        loaded_encrypted_client_secret = os.getenv('ENCRYPTED_CLIENT_SECRET').encode()
+
+        client_id = decrypt_data(loaded_encrypted_client_id, loaded_fernet_key)
+        client_secret = decrypt_data(loaded_encrypted_client_secret, loaded_fernet_key)
+
+        access_token = get_access_token(client_id, client_secret, issuer_url)
+
+        _model = AIGatewayLangchainChatOpenAI(
+            access_token=access_token, base_url=AI_GATEWAY_BASE_URL, model="o1-2024-12-17", deere_ai_gateway_registration_id="graphics-quality-check"
+        )
+        return _model
 
 def invoke_model(data_frame, prompt):
     # Convert DataFrame to JSON string to send to the model
@@ -42,24 +69,102 @@ def invoke_model(data_frame, prompt):
             },
         ],
     )
-    response = model.invoke([message])
+    model = get_model()
+    with _model_calls:
+        response = model.invoke([message])
     return response.content
 
 def read_excel_file(file_path, sheet_name=None):
     try:
-        # Read the specified sheet into a DataFrame
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        # Read the specified sheet into a DataFrame; sheets are cached as Feather
+        # files and only re-parsed when the workbook changes
+        df = read_excel_cached(file_path, sheet_name=sheet_name)
         return df
     except Exception as e:
         print(f"Failed to read Excel file: {e}")
         return None
 
-def process_excel_with_prompt(file_path, sheet_name, requirements):
+def confirm_matches(matched, prompt):
+    # The model only answers with the Ref IDs it keeps per requirement; large
+    # match sets are split into token-bounded chunks sent concurrently. Each
+    # chunk is filtered with its own answer, so a chunk whose answer doesn't
+    # parse keeps its local rows instead of losing them. Returns the rows and
+    # the requirements the model didn't answer for
+    kept, unconfirmed = [], set()
+    for chunk, answer in map_in_chunks(matched, prompt, invoke_model):
+        confirmed = merge_structured_fragments([answer])
+        unconfirmed.update(set(chunk[REQUIREMENT_COLUMN]) - set(confirmed))
+        kept.extend(filter_confirmed(chunk, confirmed).index)
+    return matched[matched.index.isin(kept)], unconfirmed
+
+def map_sheet(df, prompt, matcher, anchor_text_column, confirm_with_model=False, store=None, store_key=None,
+              requirements=None):
+    if anchor_text_column not in df.columns:
+        return f"<div>No {anchor_text_column} column in this sheet.</div>"
+    requirements = matcher.requirements if requirements is None else requirements
+
+    # Find the matching rows locally, so the model only sees the rows that
+    # matter and the prompt grows with the matches, not with the sheet. Codes
+    # (A046) and prefix queries (A04*) are looked up in the sheet's inverted
+    # index; one Aho-Corasick pass over the anchor texts finds the descriptive
+    # requirements
+    texts = df[anchor_text_column].tolist()
+    matches = matcher.match_rows(texts)
+    index_queries = [req for req in requirements if is_index_query(req)]
+    if index_queries:
+        matches.update(LegendIndex(texts).lookup_all(index_queries))
+    matches = {req: matches[req] for req in requirements}
+
+    # Descriptive requirements without an exact hit fall back to the trigram
+    # index (built once per sheet and kept on disk), which catches variants
+    # such as "Cut-Off" vs "Cutoff" or "Ground Points". Its hits are only
+    # candidates ("Ground Point (Cab)" also scores 0.71 on "Ground Points
+    # (Roof)"), so they are marked in the Match column
+    kinds = {}
+    unmatched = [req for req, rows in matches.items() if not len(rows) and not is_index_query(req)]
+    if unmatched:
+        fuzzy_index = get_trigram_index(df, anchor_text_column)
+        matches.update(fuzzy_index.lookup_all(unmatched))
+        kinds.update((req, 'fuzzy candidate') for req in unmatched)
+
+    # Whatever is still unmatched shares no spelling with its anchors ("Cab
+    # Switch", "Circuit"); a local TF-IDF + SVD embedding index finds the
+    # semantically closest anchor texts as candidates (none on small sheets,
+    # where the embedding is too coarse to tell anchors apart)
+    unmatched = [req for req in unmatched if not len(matches[req])]
+    if unmatched:
+        semantic_index = get_semantic_index(df, anchor_text_column)
+        matches.update(semantic_index.lookup_all(unmatched))
+        kinds.update((req, 'semantic candidate') for req in unmatched)
+
+    matched = matched_rows_frame(df, matches, kinds)
+    if matched.empty:
+        return NO_MATCHES_HTML
+
+    compute = (lambda frame: confirm_matches(frame, prompt)) if confirm_with_model else None
+    if store is not None:
+        # Only requirements that are new, whose matching rows changed, or that
+        # were mapped with another prompt or mode since the last run are
+        # recomputed; the rest come from the mapping store. Requirements the
+        # model didn't answer for are shown unfiltered and retried next run
+        fingerprint = hashlib.sha1(prompt.encode('utf-8')).hexdigest() if confirm_with_model else 'local'
+        matched, counts = store.sync(*store_key, matched, requirements, compute, fingerprint)
+        print(f"Sheet {counts['sheet']}: {counts['recomputed']} requirements mapped, "
+              f"{counts['failed']} unconfirmed, {counts['reused']} reused")
+    elif compute is not None:
+        matched, _ = compute(matched)
+
+    # The HTML is rendered locally, so the output is the same on every run
+    return render_legend_html(matched, requirements)
+
+def process_excel_with_prompt(file_path, sheet_name, requirements, max_sheet_concurrency=4,
+                              confirm_with_model=False, store_path="legend_mapping.sqlite"):
+    # sheet_name=None (all sheets) or a list loads the sheets in parallel and
+    # returns one result per sheet
     df = read_excel_file(file_path, sheet_name)
     if df is None:
         return "Excel file reading failed."
-    
-    results = {}
+    sheets = df if isinstance(df, dict) else {sheet_name: df}
     
     # Assuming that the only relevant column is "Anchor Text"
     anchor_text_column = "Anchor Text"  # Ensure this matches your sheet
@@ -85,19 +190,30 @@ X870-8—Power Supply for Drive Train and Transmission Control Unit (A046, A062,
 These are the mappings for "A046" obtained from the {anchor_text_column} column.
 
 Note: It is possible that not all requirements will have matching entries in the {anchor_text_column}.
-Format everything as HTML that can be used in a website. 
-Place the description in a <div> element.
+A requirement ending in "*" (for example "A04*") stands for every code or word starting with it.
+The rows provided have already been matched locally and are grouped by their "Requirement" column, so you only need to drop the rows that do not belong to their requirement.
+Rows whose "Match" column says "candidate" were found by approximate matching: keep them only if they really refer to their requirement.
+Do not format anything as HTML. Answer only with JSON mapping each requirement to the list of "Ref ID" values to keep, for example {{"A046": ["id-1", "id-2"]}}. Include every requirement you were given, with an empty list when none of its rows belong to it.
 '''
 
-    # Invoke the model with the prompt and data from the DataFrame
-    result = invoke_model(df, prompt)
-    results[sheet_name] = result
+    # The automaton is built once (over the descriptive requirements) and
+    # shared by all sheets; sheets are mapped concurrently since each one
+    # mostly waits on the model
+    requirements = list(dict.fromkeys(req.strip() for req in requirements if req.strip()))
+    matcher = RequirementMatcher([req for req in requirements if not is_index_query(req)])
+    key = workbook_key(file_path)
+    with LegendMappingStore(store_path) as store, \
+            ThreadPoolExecutor(max_workers=max(1, min(max_sheet_concurrency, len(sheets)))) as pool:
+        futures = {name: pool.submit(map_sheet, sheet, prompt, matcher, anchor_text_column, confirm_with_model,
+                                     store, (key, str(name)), requirements)
+                   for name, sheet in sheets.items()}
+        results = {name: future.result() for name, future in futures.items()}
     
     return results
 
 # Example usage
 excel_file_path = r"""C:\Users\W4FGXUV\Downloads\Legend_creation\extracted_anchors.xlsx"""  # Update with your actual file path
-sheet_name = "Sheet1"  # Specify your sheet name here
+sheet_name = "Sheet1"  # Specify your sheet name here (None maps every sheet)
 
 # Input field for requirements
 requirements_input = """A046
@@ -125,6 +241,8 @@ Hydraulic and Options Domain CAN Bus"""
 # Split the input into a list
 requirements = [req.strip() for req in requirements_input.splitlines() if req.strip()]
 
-# Process the Excel file with the provided requirements
-results = process_excel_with_prompt(excel_file_path, sheet_name, requirements)
-print(results)
+# Process the Excel file with the provided requirements (guarded so the sheet
+# parsing worker processes don't run it again when they import this module)
+if __name__ == "__main__":
+    results = process_excel_with_prompt(excel_file_path, sheet_name, requirements)
+    print(results)
@@ -0,0 +1,154 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+# pip install pytesseract   (only needed when labels are not supplied)
+
+import base64
+import re
+
+import cv2
+import numpy as np
+
+from wire_color_lut import NONE_CLASS, WIRE_STANDARD_COLORS, classify_pixels, get_color_lut
+from wire_color_validation import validate_wire_colors
+from wire_label_association import SegmentGridIndex, associate_labels
+from wire_segments import extract_wire_segments, segment_color_names
+
+# Wire codes look like 5305, 4140D, 6715A
+WIRE_CODE_PATTERN = re.compile(r'^\d{3,6}[A-Z]?$')
+
+# White is the page background, so it is not segmented by default
+DEFAULT_SEGMENT_CLASSES = [i for i, (name, _) in enumerate(WIRE_STANDARD_COLORS) if name != 'White']
+
+
+def extract_ocr_labels(image, pattern=WIRE_CODE_PATTERN, min_confidence=60):
+    """ Finds wire-code text labels with Tesseract. Returns [(text, (x, y, w, h)), ...]. """
+    try:
+        import pytesseract
+    except ImportError as e:
+        raise ImportError("pytesseract is required for OCR; pass labels explicitly instead") from e
+
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    labels = []
+    for text, conf, x, y, w, h in zip(data['text'], data['conf'], data['left'], data['top'],
+                                      data['width'], data['height']):
+        text = text.strip()
+        if pattern.match(text) and float(conf) >= min_confidence:
+            labels.append((text, (x, y, w, h)))
+    return labels
+
+
+def format_validation_report(validation_results, incorrect_colors, unresolved=()):
+    """ Formats results the same way the Checkpoint 3 prompt asks the model to. """
+    lines = []
+    for result in validation_results:
+        lines.extend([
+            f". **{result['code']}** ({result['actual_color']}):",
+            f"   - Last digit: {result['last_digit']}",
+            f"   - Expected color: {result['expected_color']}",
+            f"   - Actual color: {result['actual_color']}",
+            f"   - **Status: {result['status']}**",
+            "",
+        ])
+
+    if incorrect_colors:
+        lines.append("Based on this verification, the following wires have incorrect colors "
+                     "according to the provided list:")
+        lines.append("")
+        for result in validation_results:
+            if result['status'] == 'Incorrect':
+                lines.append(f"- **{result['code']}** ({result['actual_color']}) "
+                             f"should be {result['expected_color']}.")
+    else:
+        lines.append("All wire colors are correct!")
+
+    if unresolved:
+        lines.append("")
+        lines.append("The color of the following wires could not be determined:")
+        lines.append("")
+        lines.extend(f"- **{code}**" for code in unresolved)
+
+    return "\n".join(lines)
+
+
+def make_model_resolver(invoke_model, padding=60):
+    """ Wraps an invoke_model(image_base64, prompt) function to resolve ambiguous wires.
+
+    Each ambiguous label is sent as a small crop around the label, so only those
+    wires cost a model call.
+    """
+    names = [name for name, _ in WIRE_STANDARD_COLORS]
+    palette = "\n".join(f"{name.upper()}-HEX: {hex_code}" for name, hex_code in WIRE_STANDARD_COLORS)
+
+    def resolve(image, ambiguous_labels):
+        colors = []
+        height, width = image.shape[:2]
+        for code, (x, y, w, h) in ambiguous_labels:
+            crop = image[max(0, y - padding):min(height, y + h + padding),
+                         max(0, x - padding):min(width, x + w + padding)]
+            _, encoded = cv2.imencode('.png', cv2.cvtColor(crop, cv2.COLOR_RGB2BGR))
+            prompt = (f"What is the color of the wire labelled {code} in this schematic crop? "
+                      f"Answer with one of: {', '.join(names)}.\n{palette}")
+            answer = invoke_model(base64.b64encode(encoded.tobytes()).decode("utf-8"), prompt)
+            colors.append(next((name for name in names if name.lower() in answer.lower()), None))
+        return colors
+
+    return resolve
+
+
+def run_local_checkpoint3(image, labels=None, lut=None, lut_path='wire_color_lut.npz',
+                          tolerance=25, min_pixels=20, max_distance=100, ambiguous_distance=40,
+                          resolve_ambiguous=None):
+    """ Checkpoint 3 without the LLM: OCR labels -> pixel classes -> segments -> validation.
+
+    `image` is a BGR array (as returned by cv2.imread). `labels` may be supplied as
+    [(text, (x, y, w, h)), ...]; otherwise Tesseract is used. Labels with no segment
+    within `ambiguous_distance` pixels are ambiguous. They are sent to
+    `resolve_ambiguous(image_rgb, labels) -> colors` when given (see make_model_resolver),
+    and listed as unresolved otherwise.
+
+    Returns (report, validation_results, incorrect_colors).
+    """
+    if labels is None:
+        labels = extract_ocr_labels(image)
+    if lut is None:
+        lut = get_color_lut(lut_path, tolerance=tolerance)
+
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    class_map = classify_pixels(rgb, lut)
+
+    # The label glyphs themselves are black; keep them out of the wire segments
+    for _, (x, y, w, h) in labels:
+        class_map[max(0, y):y + h, max(0, x):x + w] = NONE_CLASS
+
+    segments = extract_wire_segments(class_map, DEFAULT_SEGMENT_CLASSES, min_pixels=min_pixels)
+    matches = associate_labels([box for _, box in labels], segments, max_distance=max_distance,
+                               index=SegmentGridIndex(segments))
+
+    confident = (matches['segment_index'] >= 0) & (matches['distance'] <= ambiguous_distance)
+    colors = np.full(len(labels), None, dtype=object)
+    colors[confident] = segment_color_names(segments[matches['segment_index'][confident]])
+
+    ambiguous = np.flatnonzero(~confident)
+    if len(ambiguous) and resolve_ambiguous is not None:
+        colors[ambiguous] = resolve_ambiguous(rgb, [labels[i] for i in ambiguous])
+
+    resolved = [i for i in range(len(labels)) if colors[i] is not None]
+    unresolved = [labels[i][0] for i in range(len(labels)) if colors[i] is None]
+    validation_results, incorrect_colors = validate_wire_colors(
+        [labels[i][0] for i in resolved], [colors[i] for i in resolved])
+
+    report = format_validation_report(validation_results, incorrect_colors, unresolved)
+    return report, validation_results, incorrect_colors
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    image = cv2.imread(sys.argv[1])
+    start = time.perf_counter()
+    report, _, _ = run_local_checkpoint3(image)
+    print(report)
+    print(f"\nCheckpoint 3 finished in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,113 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+import os
+
+import cv2
+import numpy as np
+
+from color_standards import get_color_standard, hex_to_rgb, rgb_to_lab
+
+# Standard wire colors (corporate palette used in the validation prompts), index = class id
+_CORPORATE = get_color_standard('corporate')
+WIRE_STANDARD_COLORS = list(zip(_CORPORATE.names, _CORPORATE.hexes))
+
+# Class id used for pixels that are not close enough to any standard color
+NONE_CLASS = 255
+
+DEFAULT_BINS = 32
+
+
+def _distances(samples, references, metric):
+    """ Pairwise distances between (N, 3) samples and (M, 3) reference RGB colors. """
+    if metric == 'lab':
+        samples, references = rgb_to_lab(samples), rgb_to_lab(references)
+    elif metric != 'rgb':
+        raise ValueError(f"Unknown color distance metric: {metric}")
+    samples = np.asarray(samples, dtype=np.float32)
+    references = np.asarray(references, dtype=np.float32)
+    return np.linalg.norm(samples[:, None, :] - references[None, :, :], axis=2)
+
+
+def build_color_lut(colors=WIRE_STANDARD_COLORS, bins=DEFAULT_BINS, metric='lab', tolerance=None):
+    """ Builds a (bins, bins, bins) uint8 table mapping quantized RGB to a class id.
+
+    Each bin is labelled with its nearest standard color, or NONE_CLASS when
+    the distance (in the chosen metric) is larger than the tolerance.
+    """
+    if 256 % bins:
+        raise ValueError("bins must divide 256")
+    if len(colors) >= NONE_CLASS:
+        raise ValueError("Too many standard colors for a uint8 lookup table")
+
+    # Representative color for each bin is its center
+    centers = (np.arange(bins) + 0.5) * (256 / bins)
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'), axis=-1).reshape(-1, 3)
+    references = np.array([hex_to_rgb(hex_code) for _, hex_code in colors])
+
+    distances = _distances(grid, references, metric)
+    lut = distances.argmin(axis=1).astype(np.uint8)
+    if tolerance is not None:
+        lut[distances.min(axis=1) > tolerance] = NONE_CLASS
+
+    return lut.reshape(bins, bins, bins)
+
+
+def save_color_lut(path, lut, colors=WIRE_STANDARD_COLORS, metric='lab', tolerance=None):
+    """ Persists a lookup table together with the parameters it was built with. """
+    np.savez(path, lut=lut, names=np.array([name for name, _ in colors]),
+             hexes=np.array([hex_code for _, hex_code in colors]),
+             metric=np.array(metric), tolerance=np.array(np.nan if tolerance is None else tolerance))
+
+
+def load_color_lut(path):
+    """ Loads a lookup table saved by save_color_lut. Returns (lut, colors, metric, tolerance). """
+    with np.load(path) as data:
+        colors = list(zip(data['names'].tolist(), data['hexes'].tolist()))
+        tolerance = float(data['tolerance'])
+        return (data['lut'], colors, str(data['metric']),
+                None if np.isnan(tolerance) else tolerance)
+
+
+def get_color_lut(path=None, colors=WIRE_STANDARD_COLORS, bins=DEFAULT_BINS, metric='lab',
+                  tolerance=None):
+    """ Loads the lookup table from disk if it matches the parameters, else builds and saves it. """
+    colors = list(colors)
+    if path and os.path.exists(path):
+        lut, saved_colors, saved_metric, saved_tolerance = load_color_lut(path)
+        if (lut.shape[0] == bins and saved_colors == colors and saved_metric == metric
+                and saved_tolerance == tolerance):
+            return lut
+
+    lut = build_color_lut(colors, bins, metric, tolerance)
+    if path:
+        save_color_lut(path, lut, colors, metric, tolerance)
+    return lut
+
+
+def classify_pixels(image, lut):
+    """ Returns an (H, W) class map for an RGB uint8 image using the lookup table. """
+    shift = 8 - int(np.log2(lut.shape[0]))
+    quantized = image >> shift
+    return lut[quantized[..., 0], quantized[..., 1], quantized[..., 2]]
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    start = time.perf_counter()
+    lut = get_color_lut('wire_color_lut.npz', tolerance=25)
+    print(f"Lookup table ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if len(sys.argv) > 1:
+        image = cv2.cvtColor(cv2.imread(sys.argv[1]), cv2.COLOR_BGR2RGB)
+        start = time.perf_counter()
+        class_map = classify_pixels(image, lut)
+        print(f"Classified {class_map.size} pixels in {(time.perf_counter() - start) * 1000:.1f} ms")
+        counts = np.bincount(class_map.ravel(), minlength=NONE_CLASS + 1)
+        for class_id, (name, hex_code) in enumerate(WIRE_STANDARD_COLORS):
+            print(f"{name:<7} {hex_code}: {counts[class_id]} pixels")
+        print(f"none: {counts[NONE_CLASS]} pixels")
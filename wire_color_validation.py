@@ -1,10 +1,17 @@
 # Required Libraries
 # Make sure to install these using:
 # pip install Pillow python-dotenv langchain streamlit
+# pip install numpy pandas
 
 import os
 import json
 
+import numpy as np
+import pandas as pd
+
+from color_standards import (DEFAULT_DELTA_E_TOLERANCE, DEFAULT_STANDARD, delta_e,
+                             get_color_standard, register_color_standard)
+
 # Define the color code mapping along with their hex values
 COLOR_CODE_MAP = {
     '0': {'name': 'Black', 'hex': '#000000'},
@@ -19,6 +26,11 @@ COLOR_CODE_MAP = {
     '9': {'name': 'White', 'hex': '#FFFFFF'}
 }
 
+# The generic table above is available as a color standard next to the corporate palette
+register_color_standard('generic', COLOR_CODE_MAP, replace=True)
+
+_HEX_BYTES = np.array([f'{value:02X}' for value in range(256)])
+
 # Function to extract the last digit before any alphabets
 def extract_last_digit(wire_code):
     for char in reversed(wire_code):
@@ -53,6 +65,105 @@ def validate_wire_colors(wire_codes, assigned_colors):
 
     return validation_results, incorrect_colors
 
+# Vectorized version of extract_last_digit: returns an int8 array, -1 where there is no digit
+def extract_last_digits(wire_codes):
+    codes = np.asarray(wire_codes, dtype=str)
+    if codes.size == 0 or codes.dtype.itemsize == 0:
+        return np.full(codes.shape, -1, dtype=np.int8)
+    # View the fixed-width unicode array as a (rows, characters) matrix of code points
+    width = codes.dtype.itemsize // 4
+    points = codes.view(np.uint32).reshape(len(codes), width)
+    is_digit = (points >= ord('0')) & (points <= ord('9'))
+    last = width - 1 - np.argmax(is_digit[:, ::-1], axis=1)
+    digits = points[np.arange(len(codes)), last].astype(np.int16) - ord('0')
+    return np.where(is_digit.any(axis=1), digits, -1).astype(np.int8)
+
+# Vectorized version of validate_wire_colors for large wire lists
+def validate_wire_colors_bulk(wire_codes, assigned_colors=None, code_column='code',
+                              color_column='actual_color', standard=None, tolerance=None):
+    """ Validates many wires at once and returns a DataFrame with a boolean 'mismatch' column.
+
+    Accepts two sequences/arrays, or a pandas DataFrame / pyarrow Table holding
+    `code_column` and `color_column`. Rows whose code has no digit are dropped,
+    like in validate_wire_colors.
+
+    By default actual colors are compared to COLOR_CODE_MAP by name. When a
+    color standard or a tolerance is given, or the actual colors are an (N, 3)
+    RGB array, actual colors may be names, hex strings or RGB values and a
+    wire matches when its CIE76 delta E to the expected color is within the
+    tolerance (a 'delta_e' column is added).
+    """
+    if assigned_colors is None:
+        table = wire_codes.to_pandas() if hasattr(wire_codes, 'to_pandas') else wire_codes
+        wire_codes, assigned_colors = table[code_column], table[color_column]
+
+    numeric = isinstance(assigned_colors, np.ndarray) and assigned_colors.dtype.kind in 'iuf'
+    codes = np.asarray(wire_codes, dtype=object)
+    expected_index = extract_last_digits(np.asarray(wire_codes, dtype=str))
+    keep = expected_index >= 0
+    if not keep.all():
+        codes, expected_index = codes[keep], expected_index[keep]
+
+    if numeric or standard is not None or tolerance is not None:
+        return _validate_by_delta_e(codes, expected_index, assigned_colors, keep, numeric,
+                                    get_color_standard(standard or DEFAULT_STANDARD),
+                                    DEFAULT_DELTA_E_TOLERANCE if tolerance is None else tolerance)
+
+    digits = [str(d) for d in range(10)]
+    names = [COLOR_CODE_MAP[d]['name'] for d in digits]
+    hexes = [COLOR_CODE_MAP[d]['hex'] for d in digits]
+
+    # Factorize the input column directly (no per-row str conversion), then lower-case
+    # each distinct actual color once and map it to its digit (-1 if unknown or missing)
+    actual = pd.Categorical(assigned_colors)
+    if not keep.all():
+        actual = actual[keep]
+    name_to_index = {name.lower(): i for i, name in enumerate(names)}
+    category_index = np.array([name_to_index.get(str(name).lower(), -1)
+                               for name in actual.categories] + [-1], dtype=np.int8)
+    actual_index = category_index[actual.codes]
+
+    mismatch = actual_index != expected_index
+    return pd.DataFrame({
+        'code': codes,
+        'last_digit': pd.Categorical.from_codes(expected_index, categories=digits),
+        'expected_color': pd.Categorical.from_codes(expected_index, categories=names),
+        'expected_hex': pd.Categorical.from_codes(expected_index, categories=hexes),
+        'actual_color': actual,
+        'status': pd.Categorical.from_codes(mismatch.astype(np.int8),
+                                            categories=['Correct', 'Incorrect']),
+        'mismatch': mismatch,
+    })
+
+def _validate_by_delta_e(codes, expected_index, assigned_colors, keep, numeric, standard, tolerance):
+    """ Tolerance-based part of validate_wire_colors_bulk. """
+    if numeric:
+        actual_rgb = assigned_colors.reshape(-1, 3)[keep].astype(np.float64)
+        channels = _HEX_BYTES[np.clip(np.rint(actual_rgb), 0, 255).astype(np.uint8)]
+        actual = np.char.add(np.char.add(np.char.add('#', channels[:, 0]), channels[:, 1]),
+                             channels[:, 2])
+    else:
+        actual = np.asarray(assigned_colors, dtype=object)[keep]
+        actual_rgb = standard.to_rgb(actual)
+
+    # Digits go through the standard's own table; a digit it doesn't define has no expected color
+    expected_row = standard.digit_rows[expected_index]
+    expected_lab = np.where((expected_row >= 0)[:, None], standard.lab[np.maximum(expected_row, 0)], np.nan)
+    distance = delta_e(expected_lab, standard.to_lab(actual_rgb))
+    # Unparseable colors and undefined digits have a NaN distance and count as mismatches
+    mismatch = ~(distance <= tolerance)
+    return pd.DataFrame({
+        'code': codes,
+        'last_digit': pd.Categorical.from_codes(expected_index, categories=[str(d) for d in range(10)]),
+        'expected_color': pd.Categorical.from_codes(expected_row, categories=standard.names),
+        'expected_hex': pd.Categorical.from_codes(expected_row, categories=standard.hexes),
+        'actual_color': actual,
+        'delta_e': distance,
+        'status': pd.Categorical.from_codes(mismatch.astype(np.int8),
+                                            categories=['Correct', 'Incorrect']),
+        'mismatch': mismatch,
+    })
+
 # Example usage
 if __name__ == "__main__":
     # Sample wire codes and their assigned colors for testing
@@ -0,0 +1,163 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy
+
+import numpy as np
+
+from wire_segments import segment_color_names
+
+DEFAULT_CELL_SIZE = 64
+
+# One row per OCR label: which segment it was matched to and how far away it is
+MATCH_DTYPE = np.dtype([
+    ('label_index', np.int32),
+    ('segment_index', np.int32),
+    ('distance', np.float32),
+])
+
+
+def box_distances(box, xs, ys, widths, heights):
+    """ Gap between one (x, y, w, h) box and many boxes; 0 where they overlap. """
+    x, y, w, h = box
+    dx = np.maximum(0, np.maximum(xs - (x + w), x - (xs + widths)))
+    dy = np.maximum(0, np.maximum(ys - (y + h), y - (ys + heights)))
+    return np.hypot(dx, dy)
+
+
+class SegmentGridIndex:
+    """ Uniform grid over segment bounding boxes for nearest-segment queries.
+
+    Cell contents are stored CSR-style: segment indices sorted by cell id plus
+    an offsets array, so the index is a handful of flat NumPy arrays.
+    """
+
+    def __init__(self, segments, cell_size=DEFAULT_CELL_SIZE):
+        self.segments = segments
+        self.cell_size = cell_size
+        self.xs = segments['x'].astype(np.float32)
+        self.ys = segments['y'].astype(np.float32)
+        self.widths = segments['width'].astype(np.float32)
+        self.heights = segments['height'].astype(np.float32)
+
+        if len(segments) == 0:
+            self.grid_width = self.grid_height = 0
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.cell_segments = np.empty(0, dtype=np.int32)
+            return
+
+        x0 = segments['x'] // cell_size
+        y0 = segments['y'] // cell_size
+        x1 = (segments['x'] + segments['width'] - 1) // cell_size
+        y1 = (segments['y'] + segments['height'] - 1) // cell_size
+        self.grid_width = int(x1.max()) + 1
+        self.grid_height = int(y1.max()) + 1
+
+        # Expand every segment into the cells its bounding box covers
+        spans_x = x1 - x0 + 1
+        counts = spans_x * (y1 - y0 + 1)
+        owners = np.repeat(np.arange(len(segments), dtype=np.int32), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells_x = x0[owners] + local % spans_x[owners]
+        cells_y = y0[owners] + local // spans_x[owners]
+        cells = cells_y.astype(np.int64) * self.grid_width + cells_x
+
+        order = np.argsort(cells, kind='stable')
+        self.cell_segments = owners[order]
+        self.offsets = np.searchsorted(cells[order], np.arange(self.grid_width * self.grid_height + 1))
+
+    def _ring_candidates(self, col0, row0, col1, row1, ring):
+        """ Segment indices stored in the ring of cells `ring` steps around a cell range. """
+        left, right = max(col0 - ring, 0), min(col1 + ring, self.grid_width - 1)
+        top, bottom = max(row0 - ring, 0), min(row1 + ring, self.grid_height - 1)
+        chunks = []
+        for row in range(top, bottom + 1):
+            if ring and row not in (row0 - ring, row1 + ring):
+                # Middle rows of the ring only contribute their two edge cells
+                columns = [c for c in (col0 - ring, col1 + ring) if 0 <= c < self.grid_width]
+            else:
+                columns = range(left, right + 1)
+            for column in columns:
+                cell = row * self.grid_width + column
+                chunks.append(self.cell_segments[self.offsets[cell]:self.offsets[cell + 1]])
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+
+    def nearest(self, box, max_distance=None):
+        """ Returns (segment_index, distance) of the segment closest to an (x, y, w, h) box. """
+        if len(self.segments) == 0:
+            return -1, np.inf
+
+        x, y, w, h = box
+        cs = self.cell_size
+        col0 = min(max(int(x // cs), 0), self.grid_width - 1)
+        row0 = min(max(int(y // cs), 0), self.grid_height - 1)
+        col1 = min(max(int((x + w) // cs), col0), self.grid_width - 1)
+        row1 = min(max(int((y + h) // cs), row0), self.grid_height - 1)
+        max_ring = max(self.grid_width, self.grid_height)
+
+        best_index, best_distance = -1, np.inf
+        for ring in range(max_ring + 1):
+            # Anything outside rings 0..ring-1 is at least (ring - 1) cells away
+            if best_distance <= (ring - 1) * cs:
+                break
+            if max_distance is not None and (ring - 1) * cs > max_distance:
+                break
+            candidates = self._ring_candidates(col0, row0, col1, row1, ring)
+            if len(candidates) == 0:
+                continue
+            distances = box_distances(box, self.xs[candidates], self.ys[candidates],
+                                      self.widths[candidates], self.heights[candidates])
+            position = int(np.argmin(distances))
+            if distances[position] < best_distance:
+                best_index, best_distance = int(candidates[position]), float(distances[position])
+
+        if max_distance is not None and best_distance > max_distance:
+            return -1, np.inf
+        return best_index, best_distance
+
+
+def associate_labels(label_boxes, segments, cell_size=DEFAULT_CELL_SIZE, max_distance=100,
+                     index=None):
+    """ Matches every OCR label box to its nearest wire segment. Returns MATCH_DTYPE rows. """
+    index = index or SegmentGridIndex(segments, cell_size)
+    matches = np.empty(len(label_boxes), dtype=MATCH_DTYPE)
+    for label_index, box in enumerate(label_boxes):
+        segment_index, distance = index.nearest(box, max_distance)
+        matches[label_index] = (label_index, segment_index, distance)
+    return matches
+
+
+def validation_pairs(labels, segments, matches):
+    """ Returns (wire_codes, actual_colors) for matched labels, ready for validate_wire_colors.
+
+    `labels` is a list of (text, (x, y, w, h)) tuples in the same order used for matching.
+    """
+    matched = matches[matches['segment_index'] >= 0]
+    colors = segment_color_names(segments[matched['segment_index']])
+    wire_codes = [labels[i][0] for i in matched['label_index']]
+    return wire_codes, colors.tolist()
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    from wire_segments import SEGMENT_DTYPE
+
+    rng = np.random.default_rng(0)
+    segments = np.zeros(5000, dtype=SEGMENT_DTYPE)
+    segments['segment_id'] = np.arange(5000)
+    segments['color_class'] = rng.integers(0, 10, 5000)
+    segments['x'] = rng.integers(0, 8000, 5000)
+    segments['y'] = rng.integers(0, 6000, 5000)
+    segments['width'] = rng.integers(3, 400, 5000)
+    segments['height'] = 3
+
+    labels = [(str(rng.integers(1000, 9999)), (int(s['x']) + 10, int(s['y']) - 20, 40, 14))
+              for s in segments[:3000]]
+
+    start = time.perf_counter()
+    matches = associate_labels([box for _, box in labels], segments)
+    wire_codes, actual_colors = validation_pairs(labels, segments, matches)
+    print(f"Associated {len(wire_codes)} of {len(labels)} labels in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    print(list(zip(wire_codes[:5], actual_colors[:5])))
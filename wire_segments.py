@@ -0,0 +1,97 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy opencv-python
+
+import cv2
+import numpy as np
+
+from wire_color_lut import NONE_CLASS, WIRE_STANDARD_COLORS
+
+# One row per connected wire segment
+SEGMENT_DTYPE = np.dtype([
+    ('segment_id', np.int32),
+    ('color_class', np.uint8),
+    ('x', np.int32),
+    ('y', np.int32),
+    ('width', np.int32),
+    ('height', np.int32),
+    ('pixel_count', np.int32),
+    ('cx', np.float32),
+    ('cy', np.float32),
+])
+
+
+def extract_wire_segments(class_map, classes=None, min_pixels=20, connectivity=8,
+                          return_labels=False):
+    """ Runs connected-component labeling on each standard-color mask of a class map.
+
+    Returns a structured array with SEGMENT_DTYPE rows. With return_labels=True an
+    (H, W) int32 map of segment ids (-1 for no segment) is returned as well.
+    """
+    if classes is None:
+        classes = np.unique(class_map)
+        classes = classes[classes != NONE_CLASS]
+
+    tables = []
+    labels_out = np.full(class_map.shape, -1, dtype=np.int32) if return_labels else None
+    next_id = 0
+
+    for color_class in classes:
+        mask = (class_map == color_class).view(np.uint8)
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(
+            mask, connectivity=connectivity, ltype=cv2.CV_32S)
+
+        # Label 0 is the background of this mask
+        keep = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= min_pixels) + 1
+        if len(keep) == 0:
+            continue
+
+        table = np.empty(len(keep), dtype=SEGMENT_DTYPE)
+        table['segment_id'] = np.arange(next_id, next_id + len(keep))
+        table['color_class'] = color_class
+        table['x'] = stats[keep, cv2.CC_STAT_LEFT]
+        table['y'] = stats[keep, cv2.CC_STAT_TOP]
+        table['width'] = stats[keep, cv2.CC_STAT_WIDTH]
+        table['height'] = stats[keep, cv2.CC_STAT_HEIGHT]
+        table['pixel_count'] = stats[keep, cv2.CC_STAT_AREA]
+        table['cx'] = centroids[keep, 0]
+        table['cy'] = centroids[keep, 1]
+        tables.append(table)
+
+        if return_labels:
+            # Map this mask's component labels to global segment ids
+            remap = np.full(count, -1, dtype=np.int32)
+            remap[keep] = table['segment_id']
+            segment_ids = remap[labels]
+            np.copyto(labels_out, segment_ids, where=segment_ids >= 0)
+
+        next_id += len(keep)
+
+    segments = np.concatenate(tables) if tables else np.empty(0, dtype=SEGMENT_DTYPE)
+    if return_labels:
+        return segments, labels_out
+    return segments
+
+
+def segment_color_names(segments, colors=WIRE_STANDARD_COLORS):
+    """ Returns the standard color name for every segment row. """
+    names = np.array([name for name, _ in colors] + ['none'] * (NONE_CLASS + 1 - len(colors)))
+    return names[segments['color_class']]
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from wire_color_lut import classify_pixels, get_color_lut
+
+    image = cv2.cvtColor(cv2.imread(sys.argv[1]), cv2.COLOR_BGR2RGB)
+    lut = get_color_lut('wire_color_lut.npz', tolerance=25)
+
+    start = time.perf_counter()
+    segments = extract_wire_segments(classify_pixels(image, lut))
+    print(f"Extracted {len(segments)} segments in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for segment, name in zip(segments[:20], segment_color_names(segments[:20])):
+        print(f"#{segment['segment_id']} {name:<7} bbox=({segment['x']}, {segment['y']}, "
+              f"{segment['width']}, {segment['height']}) pixels={segment['pixel_count']}")
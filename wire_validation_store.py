@@ -0,0 +1,144 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install numpy pandas
+
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from wire_color_validation import extract_last_digits, validate_wire_colors_bulk
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wire_validation (
+    harness_id TEXT NOT NULL,
+    wire_code TEXT NOT NULL,
+    actual_color TEXT COLLATE NOCASE,
+    content_hash INTEGER NOT NULL,
+    last_digit TEXT,
+    expected_color TEXT COLLATE NOCASE,
+    expected_hex TEXT,
+    status TEXT NOT NULL,
+    mismatch INTEGER NOT NULL,
+    revision TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (harness_id, wire_code)
+);
+CREATE INDEX IF NOT EXISTS idx_mismatch_harness ON wire_validation (mismatch, harness_id);
+CREATE INDEX IF NOT EXISTS idx_mismatch_expected ON wire_validation (mismatch, expected_color);
+CREATE INDEX IF NOT EXISTS idx_mismatch_actual ON wire_validation (mismatch, actual_color);
+"""
+
+_COLUMNS = ['harness_id', 'wire_code', 'actual_color', 'content_hash', 'last_digit',
+            'expected_color', 'expected_hex', 'status', 'mismatch', 'revision', 'updated_at']
+
+
+def _row_hashes(frame):
+    """ 64-bit content hash per (wire_code, actual_color) row, as signed ints for SQLite. """
+    return pd.util.hash_pandas_object(frame[['wire_code', 'actual_color']], index=False) \
+        .to_numpy().view(np.int64)
+
+
+class WireValidationStore:
+    """ SQLite store of wire validation results keyed by (harness id, wire code).
+
+    sync() diffs a new export against the stored content hashes and only
+    re-validates new or changed wires; removed wires are deleted.
+    """
+
+    def __init__(self, path='wire_validation.sqlite'):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def sync(self, harness_id, wire_codes, actual_colors, revision=None):
+        """ Brings the stored results for a harness in line with a new export. Returns counts. """
+        export = pd.DataFrame({'wire_code': pd.Series(wire_codes, dtype=object).astype(str),
+                               'actual_color': pd.Series(actual_colors, dtype=object).astype(str)})
+        export = export.drop_duplicates('wire_code', keep='last').reset_index(drop=True)
+        export['content_hash'] = _row_hashes(export)
+
+        stored = pd.read_sql_query(
+            "SELECT wire_code, content_hash AS stored_hash FROM wire_validation WHERE harness_id = ?",
+            self.connection, params=(harness_id,))
+        # Nullable ints keep the 64-bit hashes exact through the left join
+        stored['stored_hash'] = stored['stored_hash'].astype('Int64')
+        merged = export.merge(stored, on='wire_code', how='left')
+        changed = merged[(merged['stored_hash'] != merged['content_hash']).fillna(True)]
+        gone = stored[['wire_code']].merge(export[['wire_code']], on='wire_code', how='left',
+                                           indicator=True)
+        removed = gone.loc[gone['_merge'] == 'left_only', 'wire_code']
+
+        # Codes without a digit can't be validated, store them as skipped so they aren't redone
+        changed = changed.reset_index(drop=True)
+        rows = pd.DataFrame({
+            'harness_id': harness_id,
+            'wire_code': changed['wire_code'],
+            'actual_color': changed['actual_color'],
+            'content_hash': changed['content_hash'],
+            'last_digit': None,
+            'expected_color': None,
+            'expected_hex': None,
+            'status': 'Skipped',
+            'mismatch': 0,
+            'revision': revision,
+            'updated_at': time.time(),
+        }, columns=_COLUMNS)
+        valid = np.flatnonzero(extract_last_digits(changed['wire_code'].to_numpy(dtype=str)) >= 0)
+        if len(valid):
+            result = validate_wire_colors_bulk(changed['wire_code'].to_numpy(),
+                                               changed['actual_color'].to_numpy())
+            for column in ('last_digit', 'expected_color', 'expected_hex', 'status'):
+                rows.loc[valid, column] = result[column].astype(str).to_numpy()
+            rows.loc[valid, 'mismatch'] = result['mismatch'].astype(int).to_numpy()
+
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM wire_validation WHERE harness_id = ? AND wire_code = ?",
+                ((harness_id, code) for code in removed))
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO wire_validation ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None))
+
+        return {'harness_id': harness_id, 'revalidated': len(changed), 'removed': len(removed),
+                'unchanged': len(export) - len(changed)}
+
+    def mismatches(self, harness_id=None, color=None):
+        """ Current incorrect wires, optionally for one harness and/or one (expected or actual) color. """
+        query = "SELECT * FROM wire_validation WHERE mismatch = 1"
+        params = []
+        if harness_id is not None:
+            query += " AND harness_id = ?"
+            params.append(harness_id)
+        if color is not None:
+            query += " AND (expected_color = ? OR actual_color = ?)"
+            params.extend([color, color])
+        return pd.read_sql_query(query, self.connection, params=params)
+
+    def summary(self):
+        """ Wire, mismatch and skipped counts per harness. """
+        return pd.read_sql_query(
+            "SELECT harness_id, COUNT(*) AS wires, SUM(mismatch) AS incorrect, "
+            "SUM(status = 'Skipped') AS skipped FROM wire_validation GROUP BY harness_id",
+            self.connection)
+
+
+# Example usage
+if __name__ == "__main__":
+    with WireValidationStore(':memory:') as store:
+        print(store.sync('H-100', ["5305", "5301", "5804", "ABC"], ["Black", "Brown", "Yellow", "Red"],
+                         revision='A'))
+        print(store.sync('H-100', ["5305", "5301", "5804"], ["Green", "Brown", "Yellow"],
+                         revision='B'))
+        print(store.mismatches('H-100'))
+        print(store.summary())
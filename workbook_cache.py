@@ -0,0 +1,162 @@
+# Required Libraries
+# Make sure to install these using:
+# pip install pandas openpyxl pyarrow
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow.feather as feather
+
+DEFAULT_CACHE_DIR = '.workbook_cache'
+
+
+def workbook_key(file_path):
+    """ Stable short key for a workbook, derived from its absolute path. """
+    return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+
+
+def _cache_folder(file_path, cache_dir):
+    return os.path.join(cache_dir, workbook_key(file_path))
+
+
+def _workbook_stamp(file_path):
+    stat = os.stat(file_path)
+    return {'path': os.path.abspath(file_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _load_manifest(folder, stamp):
+    """ The cache manifest if it still describes the workbook on disk, else a fresh one. """
+    try:
+        with open(os.path.join(folder, 'manifest.json'), 'r') as file:
+            manifest = json.load(file)
+        if manifest.get('stamp') == stamp:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    # Workbook changed (or no cache yet): drop every cached sheet
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder, exist_ok=True)
+    return {'stamp': stamp, 'sheet_names': None, 'sheets': {}}
+
+
+def _save_manifest(folder, manifest):
+    path = os.path.join(folder, 'manifest.json')
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file)
+    os.replace(path + '.tmp', path)
+
+
+def _stringify_mixed(data_frame):
+    """ Converts object columns that mix types (e.g. numbers and text) to str, keeping NaN. """
+    data_frame = data_frame.copy()
+    converted = []
+    for column in data_frame.columns[data_frame.dtypes == object]:
+        values = data_frame[column]
+        if values.dropna().map(type).nunique() > 1:
+            data_frame[column] = values.map(lambda value: value if pd.isna(value) else str(value))
+            converted.append(column)
+    return data_frame, converted
+
+
+def _store_sheet(folder, manifest, sheet, data_frame):
+    """ Writes one sheet as uncompressed Feather (memory-mappable); skips frames Arrow can't hold.
+
+    Arrow needs one type per column, so mixed-type columns are cached as text.
+    Returns the frame as it will be loaded from the cache.
+    """
+    if not all(isinstance(column, str) for column in data_frame.columns):
+        return data_frame
+    original = data_frame
+    file_name = hashlib.sha1(sheet.encode('utf-8')).hexdigest()[:16] + '.feather'
+    data_frame, converted = _stringify_mixed(data_frame.reset_index(drop=True))
+    try:
+        feather.write_feather(data_frame, os.path.join(folder, file_name),
+                              compression='uncompressed')
+    except (TypeError, ValueError, OSError) as e:
+        print(f"Not caching sheet {sheet}: {e}")
+        return original
+    manifest['sheets'][sheet] = file_name
+    if converted:
+        print(f"Cached mixed-type columns of sheet {sheet} as text: {converted}")
+    return data_frame
+
+
+def _parse_sheet(file_path, sheet):
+    """ Parses one sheet; pandas' openpyxl engine opens the workbook read-only and streams its rows. """
+    return sheet, pd.read_excel(file_path, sheet_name=sheet, engine='openpyxl')
+
+
+def _parse_sheets(file_path, sheets, workers):
+    """ {sheet: DataFrame}, parsing the sheets in worker processes when there are several. """
+    workers = min(workers or os.cpu_count() or 1, len(sheets))
+    if workers <= 1:
+        return pd.read_excel(file_path, sheet_name=sheets)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_parse_sheet, [file_path] * len(sheets), sheets))
+
+
+def _load_sheet(folder, file_name):
+    table = feather.read_table(os.path.join(folder, file_name), memory_map=True)
+    return table.to_pandas()
+
+
+def read_excel_cached(file_path, sheet_name=0, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """ pd.read_excel with a columnar cache keyed by path, mtime and size.
+
+    Sheets are converted to Feather once; later calls memory-map the Feather
+    files. Like pd.read_excel, sheet_name=None returns a dict of all sheets and
+    a list returns a dict of the listed sheets. Uncached sheets are parsed in
+    up to `workers` processes (default: one per CPU).
+    """
+    folder = _cache_folder(file_path, cache_dir)
+    manifest = _load_manifest(folder, _workbook_stamp(file_path))
+
+    if manifest['sheet_names'] is None:
+        with pd.ExcelFile(file_path) as workbook:
+            manifest['sheet_names'] = workbook.sheet_names
+    sheet_names = manifest['sheet_names']
+
+    if sheet_name is None:
+        wanted = list(sheet_names)
+    elif isinstance(sheet_name, list):
+        wanted = [sheet_names[s] if isinstance(s, int) else s for s in sheet_name]
+    else:
+        wanted = [sheet_names[sheet_name] if isinstance(sheet_name, int) else sheet_name]
+
+    frames = {}
+    missing = []
+    for sheet in wanted:
+        if sheet in manifest['sheets']:
+            frames[sheet] = _load_sheet(folder, manifest['sheets'][sheet])
+        else:
+            missing.append(sheet)
+
+    if missing:
+        parsed = _parse_sheets(file_path, missing, workers)
+        for sheet in missing:
+            data_frame = parsed[sheet]
+            frames[sheet] = _store_sheet(folder, manifest, sheet, data_frame)
+        _save_manifest(folder, manifest)
+
+    if sheet_name is None or isinstance(sheet_name, list):
+        return {sheet: frames[sheet] for sheet in wanted}
+    return frames[wanted[0]]
+
+
+def clear_workbook_cache(cache_dir=DEFAULT_CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for attempt in ("first", "cached"):
+        start = time.perf_counter()
+        sheets = read_excel_cached(sys.argv[1], sheet_name=None)
+        print(f"{attempt} load: {len(sheets)} sheets in {(time.perf_counter() - start) * 1000:.1f} ms")